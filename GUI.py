@@ -1,9 +1,58 @@
+import math
+import re
+import sys
+import time
+_startup_t0 = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk
 from tkinter import *
 from typing import List, Dict, Any, Optional
+import numpy as np
 from tkinter import messagebox
-from PIL import Image, ImageTk
+from routing import ROUTERS, FloydRouter, RouteCache, create_router, floyd_warshall, get_path
+from matrix_cache import load_matrix
+from simulation import DEFAULT_SCHEDULES, SECONDS_PER_MINUTE, SimClock, SimulationEngine
+from agents import DEFAULT_AGENT_ACTIVITIES, DEFAULT_AGENT_INFO, AgentStore, parse_time
+from campus_data import BUILDINGS, NODE_POSITIONS, campus_edges
+from schedule_generator import generate_schedules
+from node_index import NodeIndex
+from edge_table import CAPACITY_LABELS, DIFFICULTY_LABELS, EdgeTable
+from virtual_table import VirtualTable
+from canvas_layers import CanvasLayers
+
+# day colors of the building icons, night colors are derived once from these
+BUILDING_COLORS = {
+    "teaching": "#ADD8E6",  # Teaching Building - Light Blue
+    "dormitory": "#98FB98",  # Dormitory - Light Green
+    "canteen": "#FFB6C1",  # Dining Hall - Pink
+    "default": "#D3D3D3",  # Default - Light Gray
+    "innovative2": "#FFFF00",  # McDonald's - Yellow
+    "playground & gym": "#E42833",  # Playground - Red
+    "hospital": "#B245F5",  # Medical Center - Purple
+    "academy": "#FF7F00",  # Academy
+    "playground": "#0170C5",  # Playground - Blue
+    "square": "#eadfb4",  # Square - Gray-Yellow
+    "service center": "#b4eab5",  # Service Center
+    "basketball ground": "#f9b868"  # Basketball Court
+}
+
+# icon edge length per building type, DEFAULT_ICON_SIZE for the rest
+DEFAULT_ICON_SIZE = 20
+BUILDING_SIZES = {
+    "library": 60,
+    "playground & gym": 90,
+    "hospital": 40,
+    "playground": 55,
+    "square": 80,
+    "basketball ground": 40,
+}
+
+
+def building_type_tag(building_type: str) -> str:
+    """Canvas tag shared by every icon of a type ("playground & gym" -> "type:playground_gym")"""
+    return "type:" + re.sub(r"\W+", "_", building_type)
+
 
 class BuildingIcon:
 
@@ -13,55 +62,23 @@ class BuildingIcon:
         self.y = y
         self.type = building_type
         self.name = name
-        self._icon_size = 20
+        self._icon_size = BUILDING_SIZES.get(building_type, DEFAULT_ICON_SIZE)
         self._icon = None
         self._label = None
 
-        if (self.type == 'library'):
-            self._icon_size = 60
-        self.create_icon()
-
-        if (self.type == "playground & gym"):
-            self._icon_size = 90
-        self.create_icon()
-        if (self.type == "hospital"):
-            self._icon_size = 40
-        self.create_icon()
-        if (self.type == "playground"):
-            self._icon_size = 55
-            self.create_icon()
-        if (self.type == "square"):
-            self._icon_size = 80
-            self.create_icon()
-        if (self.type == "basketball ground"):
-            self._icon_size = 40
+        # exactly one rectangle and one label per building
         self.create_icon()
 
     def create_icon(self):
         """Create Icon"""
-        colors = {
-            "teaching": "#ADD8E6",  # Teaching Building - Light Blue
-            "dormitory": "#98FB98",  # Dormitory - Light Green
-            "canteen": "#FFB6C1",  # Dining Hall - Pink
-            "default": "#D3D3D3",  # Default - Light Gray
-            "innovative2": "#FFFF00",  # McDonald's - Yellow
-            "playground & gym": "#E42833",  # Playground - Red
-            "hospital": "#B245F5",  # Medical Center - Purple
-            "academy": "#FF7F00",  # Academy
-            "playground": "#0170C5",  # Playground - Blue
-            "square": "#eadfb4",  # Square - Gray-Yellow
-            "service center": "#b4eab5",  # Service Center
-            "basketball ground": "#f9b868"  # Basketball Court
-        }
-
-        color = colors.get(self.type, colors["default"])
+        color = BUILDING_COLORS.get(self.type, BUILDING_COLORS["default"])
 
         self._icon = self.canvas.create_rectangle(
             self.x, self.y,
             self.x + self._icon_size,
             self.y + self._icon_size,
             fill=color,
-            tags=("building", self.name)
+            tags=("building", self.name, building_type_tag(self.type))
         )
 
         self._label = self.canvas.create_text(
@@ -71,6 +88,126 @@ class BuildingIcon:
             tags=("label", self.name)
         )
 
+class RouteAnimator:
+    """
+    Moves every walking agent from one fixed-rate frame loop.
+
+    Each agent follows a precomputed polyline at a constant time per edge.
+    Positions live in an AgentStore, so a frame is one vectorized advance of
+    all walkers followed by one pass of canvas.coords, instead of one
+    root.after chain per edge and per agent.
+    """
+
+    def __init__(self, root: tk.Tk, canvas: tk.Canvas, store: AgentStore = None, fps: int = 30, on_stats=None):
+        """
+        Args:
+            store: agent rows to animate, rows are added for unknown items
+            fps: frame rate while at least one agent is moving
+            on_stats: on_stats(frame_seconds, active_agents) after every frame
+        """
+        self.root = root
+        self.canvas = canvas
+        self.store = store if store is not None else AgentStore()
+        self.frame_ms = max(1, int(1000 / fps))
+        self.on_stats = on_stats
+        self.frame_time = 0.0
+        # walking speed multiplier, follows the simulation clock speed
+        self.time_scale = 1.0
+        self.paused = False
+        self._rows = {}  # canvas item -> store row
+        self._items = {}  # store row -> (canvas item, half size)
+        self._callbacks = {}  # store row -> callback at the end of the route
+        self._last = None
+        self._after_id = None
+
+    def start(self, item, points, edge_ms: float, callback=None, row: int = None, elapsed_ms: float = 0.0):
+        """
+        Walk canvas item along points, edge_ms per edge, then call callback.
+        elapsed_ms of the walk are skipped, for departures processed late.
+        With edge_ms = inf the edges wait to be timed in the store, see
+        AgentStore.time_edge.
+        """
+        if row is None:
+            row = self._rows.get(item)
+            if row is None:
+                row = self.store.add()
+        elif self._rows.get(item, row) != row:
+            self.stop(item)
+        self._rows[item] = row
+
+        x1, y1, x2, y2 = self.canvas.coords(item)
+        self._items[row] = (item, ((x2 - x1) / 2, (y2 - y1) / 2))
+        self.store.set_route(row, points, edge_ms / 1000, elapsed_ms / 1000)
+        self._place(row, points[0][0], points[0][1])
+
+        if len(points) < 2:
+            self._callbacks.pop(row, None)
+            if callback:
+                callback()
+            return
+
+        self._callbacks[row] = callback
+        if self._after_id is None and not self.paused:
+            self._last = time.perf_counter()
+            self._after_id = self.root.after(self.frame_ms, self._frame)
+
+    def pause(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+        if self._after_id is None and self.store.moving().size:
+            self._last = time.perf_counter()
+            self._after_id = self.root.after(self.frame_ms, self._frame)
+
+    def step(self, seconds: float):
+        """Advance every walker by seconds at speed 1, e.g. while paused"""
+        self._advance(seconds)
+
+    def stop(self, item):
+        row = self._rows.get(item)
+        if row is not None:
+            self.store.stop(row)
+            self._callbacks.pop(row, None)
+
+    def _place(self, row, x, y):
+        item, (hw, hh) = self._items[row]
+        self.canvas.coords(item, x - hw, y - hh, x + hw, y + hh)
+
+    def _frame(self):
+        now = time.perf_counter()
+        # one frame covers all time since the last one, late frames are not replayed
+        seconds = (now - self._last) * self.time_scale
+        self._last = now
+        self._after_id = None
+        still_moving = self._advance(seconds)
+
+        # the loop only runs while someone is moving, a callback may have re-armed it
+        if still_moving and self._after_id is None and not self.paused:
+            self._after_id = self.root.after(self.frame_ms, self._frame)
+
+    def _advance(self, seconds: float) -> bool:
+        """Move the walkers, fire finished callbacks, True if someone is still walking"""
+        now = time.perf_counter()
+        moved, finished = self.store.advance(seconds)
+
+        for row, x, y in zip(moved.tolist(), self.store.x[moved].tolist(), self.store.y[moved].tolist()):
+            self._place(row, x, y)
+
+        callbacks = [self._callbacks.pop(row, None) for row in finished.tolist()]
+        self.frame_time = time.perf_counter() - now
+        if self.on_stats:
+            self.on_stats(self.frame_time, len(moved))
+
+        for callback in callbacks:
+            if callback:
+                callback()
+        return len(moved) > len(finished)
+
+
 class CampusGUI:
 
     def __init__(self, root: tk.Tk):
@@ -81,6 +218,8 @@ class CampusGUI:
 
         # "day" and "night"
         self.current_mode = "day"
+        self.mode_icon = None
+        self._palettes = {}
 
         # main frame
         self.create_main_frame()
@@ -95,6 +234,7 @@ class CampusGUI:
         self.create_info_panel()
 
         self.buildings: List[BuildingIcon] = []
+        self.building_types = set()
 
         # event
         self.bind_events()
@@ -103,30 +243,158 @@ class CampusGUI:
         self.animation_id = None
 
         self.node_positions = {}  # dictionary for node
+        self.node_index = NodeIndex({})  # coordinate -> node lookups
         self.current_path = []
-        self.path_lines = []
+        self.route_lines = {}  # student id -> route polyline item
         self.auto_movement_running = False
-        self.path_infos = {}  # dictionary for path infos
+        self.edge_table = EdgeTable()  # attributes of every drawn edge, by edge id
+        self.line_edges = {}  # canvas line id -> edge id
+        self.canvas.tag_bind("edge", '<Button-1>', self.on_edge_click)
 
-        self.path_lines = []  # list for path
         self.animation_id = None
         self.moving_point = None
+        self.router = FloydRouter()  # all-pairs result, shared by every trip
+        # node path + polyline of repeated trips, keyed by the router's graph_version
+        self.route_cache = RouteCache(self.router, self.node_positions)
         self.floyd_matrix = None  # Floyd matrix
+        self.sim_engine = None  # departure queue, advanced by apply_clock
 
         # 8:20
         self.map_hours = 8
         self.map_minutes = 20
+        # wall-clock driven, map_hours / map_minutes only mirror it for display
+        self.clock = SimClock(start_minute=self.map_hours * 60 + self.map_minutes)
+        self.clock_tick_ms = 100
+        self._clock_after_id = None
         self.time_text = tk.Text(self.control_frame, height=1, wrap=tk.NONE)
         self.time_text.pack(fill=tk.X, padx=5, pady=5)
         self.update_time_display()
+        self.create_clock_controls()
 
         self.simulation_running = True
 
         self.status_text = tk.Text(self.control_frame, height=2, wrap=tk.WORD)
         self.status_text.pack(fill=tk.X, padx=5, pady=5)
 
+        # frame time / active agents of the animation loop
+        self.frame_stats_var = tk.StringVar(value="Frame: - ms | Moving: 0")
+        ttk.Label(self.control_frame, textvariable=self.frame_stats_var).pack(padx=5, pady=2)
+        # one row per agent, seeded with the default 7 agents
+        self.schedules = DEFAULT_SCHEDULES
+        self.agents = AgentStore.from_schedules(self.schedules)
+        self.animator = RouteAnimator(self.root, self.canvas, self.agents, fps=30,
+                                      on_stats=self.update_frame_stats)
+
+    def set_schedules(self, schedules):
+        """Replace the simulated agents, e.g. with generate_schedules()"""
+        self.schedules = schedules
+        self.agents = AgentStore.from_schedules(schedules)
+        self.animator.store = self.agents
+        self.discard_engine()
+
+    def discard_engine(self):
+        """Drop the running simulation, agents still walking stop loading the router"""
+        self.sim_engine = None
+        if hasattr(self.router, "clear_loads"):
+            self.router.clear_loads()
+
+    def create_clock_controls(self):
+
+        clock_frame = ttk.Frame(self.control_frame)
+        clock_frame.pack(fill=tk.X, padx=5, pady=2)
+
+        self.pause_button = ttk.Button(clock_frame, text="Pause", width=8, command=self.toggle_pause)
+        self.pause_button.pack(side=tk.LEFT)
+        ttk.Button(clock_frame, text="Step 1 min", command=self.step_clock).pack(side=tk.LEFT, padx=2)
+
+        ttk.Label(clock_frame, text="Speed:").pack(side=tk.LEFT, padx=(5, 0))
+        self.speed_var = tk.StringVar(value="1x")
+        speed_box = ttk.Combobox(clock_frame, textvariable=self.speed_var, width=5, state="readonly",
+                                 values=("1x", "2x", "5x", "10x", "30x", "100x"))
+        speed_box.pack(side=tk.LEFT)
+        speed_box.bind("<<ComboboxSelected>>", lambda e: self.set_speed(float(self.speed_var.get().rstrip("x"))))
+
+    def set_speed(self, speed: float):
+        """Pace multiplier for the clock and the walkers, 1 is one simulated minute per second"""
+        self.clock.set_speed(speed)
+        self.animator.time_scale = speed
+
+    def toggle_pause(self):
+
+        if self.clock.running:
+            self.clock.pause()
+            self.animator.pause()
+            if self._clock_after_id is not None:
+                self.root.after_cancel(self._clock_after_id)
+                self._clock_after_id = None
+            self.pause_button.configure(text="Resume")
+        elif self.sim_engine is not None:
+            self.start_time_update()
+
+    def step_clock(self, minutes: float = 1):
+        """Pause, then move the whole simulation ahead by minutes"""
+        if self.clock.running:
+            self.toggle_pause()
+        before = self.clock.minute
+        self.clock.step(minutes)
+        self.animator.step((self.clock.minute - before) * SECONDS_PER_MINUTE)
+        self.apply_clock()
+        # places the agents that departed during the step
+        self.animator.step(0)
+
+    def update_frame_stats(self, frame_seconds, active_agents):
+        cache = self.route_cache
+        self.frame_stats_var.set(f"Frame: {frame_seconds * 1000:.2f} ms | Moving: {active_agents} | "
+                                 f"Routes cached: {cache.hits}/{cache.hits + cache.misses}")
+
+    @property
+    def floyd_matrix(self):
+        return self.router.matrix
+
+    @floyd_matrix.setter
+    def floyd_matrix(self, matrix):
+        # solved once here, reused until a new matrix is assigned
+        self.router.set_matrix(matrix)
+
+    def set_edge_weight(self, start_node: int, end_node: int, weight: float):
+        """Reweight a footpath in both directions (1-based, inf closes it)"""
+        for a, b in ((start_node - 1, end_node - 1), (end_node - 1, start_node - 1)):
+            self.router.update_edge(a, b, weight)
+
+    def set_rain(self, raining: bool, factor: float = 2.0):
+        """Multiply the Hard (Stairs/Steep Slope) edges by factor, or restore them"""
+        matrix = self.floyd_matrix
+        if matrix is None:
+            return
+        table = self.edge_table
+        n = len(matrix)
+        hard = np.flatnonzero((table.difficulty == len(DIFFICULTY_LABELS) - 1)
+                              & (table.start >= 1) & (table.start <= n) & (table.end >= 1) & (table.end <= n))
+        if not hasattr(self, "_dry_weights"):
+            self._dry_weights = {}
+        changes = []
+        for start, end in zip(table.start[hard].tolist(), table.end[hard].tolist()):
+            for a, b in ((start - 1, end - 1), (end - 1, start - 1)):
+                dry = self._dry_weights.setdefault((a, b), float(matrix[a][b]))
+                if np.isfinite(dry):
+                    changes.append((a, b, dry * factor if raining else dry))
+        self.router.update_edges(changes)
+
+    def set_router(self, name: str):
+        """Switch the routing backend, see routing.ROUTERS"""
+        matrix = self.floyd_matrix
+        self.router = create_router(name, self.node_positions)
+        self.router.set_matrix(matrix)
+        self.route_cache.router = self.router
+        if self.sim_engine is not None:
+            self.sim_engine.router = self.router
+
     def show_node_maps(self):
         """show node maps"""
+        # map_tiles pulls in PIL, keep it out of startup
+        from PIL import ImageTk
+        from map_tiles import TilePyramid, TileViewer, decode_preview, run_in_background
+
         map_window = tk.Toplevel(self.root)
         map_window.title("Campus Node Maps")
 
@@ -153,8 +421,6 @@ class CampusGUI:
             x_scrollbar = ttk.Scrollbar(frame, orient=tk.HORIZONTAL, command=canvas.xview)
             y_scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=canvas.yview)
 
-            canvas.configure(xscrollcommand=x_scrollbar.set, yscrollcommand=y_scrollbar.set)
-
             canvas.grid(row=0, column=0, sticky="nsew")
             x_scrollbar.grid(row=1, column=0, sticky="ew")
             y_scrollbar.grid(row=0, column=1, sticky="ns")
@@ -162,47 +428,41 @@ class CampusGUI:
             frame.grid_rowconfigure(0, weight=1)
             frame.grid_columnconfigure(0, weight=1)
 
-            try:
-
-                image = Image.open(image_path)
-
-                max_width = window_width - 50
-                max_height = window_height - 50
-
-                resized_image = self.resize_image(image, max_width, max_height)
-                photo = ImageTk.PhotoImage(resized_image)
-
-                canvas.config(scrollregion=(0, 0, image.width, image.height))
-
-                canvas_image = canvas.create_image(0, 0, image=photo, anchor="nw")
-
-                canvas.image = photo
+            max_width = window_width - 50
+            max_height = window_height - 50
+            placeholder = canvas.create_text(max_width // 2, max_height // 2,
+                                             text=f"Loading {image_path}...", fill="gray")
 
-                def on_mousewheel(event):
-                    if event.state == 4:
-                        scale = 1.1 if event.delta > 0 else 0.9
-
-                        current_width = canvas.bbox(canvas_image)[2]
-                        current_height = canvas.bbox(canvas_image)[3]
-
-                        new_width = int(current_width * scale)
-                        new_height = int(current_height * scale)
-
-                        resized = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                        photo_new = ImageTk.PhotoImage(resized)
-                        canvas.delete(canvas_image)
-                        canvas.create_image(0, 0, image=photo_new, anchor="nw")
-                        canvas.image = photo_new  # 保持引用
-                        canvas.config(scrollregion=canvas.bbox("all"))
-
-                canvas.bind("<MouseWheel>", on_mousewheel)
-
-            except Exception as e:
+            def show_error(e):
                 print(f"Error loading image {image_path}: {e}")
+                canvas.delete("all")
                 canvas.create_text(window_width // 2, window_height // 2,
                                    text=f"Error loading map image: {image_path}",
                                    fill="red")
 
+            def show_preview(image):
+                # the full viewer may already be up if the tiles were cached
+                if hasattr(canvas, "viewer"):
+                    return
+                canvas.preview = ImageTk.PhotoImage(image)
+                canvas.delete(placeholder)
+                canvas.create_image(0, 0, image=canvas.preview, anchor="nw", tags="preview")
+
+            def show_tiles(pyramid):
+                # tiles are cut once per map and reused from disk afterwards,
+                # Ctrl+wheel zooms by picking tiles instead of resizing the map
+                canvas.delete("all")
+                canvas.preview = None
+                viewer = TileViewer(canvas, pyramid)
+                viewer.attach_scrollbars(x_scrollbar, y_scrollbar)
+                viewer.fit(max_width, max_height)
+                canvas.viewer = viewer
+
+            # decoding and cutting run on worker threads, the window is usable at once
+            run_in_background(canvas, lambda: decode_preview(image_path, max_width, max_height),
+                              show_preview, show_error)
+            run_in_background(canvas, TilePyramid(image_path).load, show_tiles, show_error)
+
         # 创建两个地图标签页
         create_map_tab("Map 1", "map1.jpg")
         create_map_tab("Map 2", "map2.png")
@@ -211,224 +471,109 @@ class CampusGUI:
         close_button = ttk.Button(map_window, text="Close", command=map_window.destroy)
         close_button.pack(pady=5)
 
-    def resize_image(self, image, max_width, max_height):
-
-        width, height = image.size
-
-        width_ratio = max_width / width
-        height_ratio = max_height / height
-        ratio = min(width_ratio, height_ratio)
-
-        new_width = int(width * ratio)
-        new_height = int(height * ratio)
-
-        return image.resize((new_width, new_height), Image.Resampling.LANCZOS)
     def print_student_schedule(self):
-        """Print student schedules with their information"""
-        student_schedules = {
-            1: [
-                "08:40 Depart from dormitory D5e to classroom F3b for class",
-                "12:00 After class, go to cafeteria F5b for lunch",
-                "12:40 Return to dormitory D5e to rest after lunch",
-                "13:25 Depart from dormitory to classroom F3a for class",
-                "17:05 After class, go to cafeteria D5b for dinner",
-                "17:35 After dinner, go to library E3 for self-study",
-                "21:30 Return to dormitory D5e from library to rest"
-            ],
-            2: [
-                "08:30 Depart from dormitory D5f to classroom F3a for class",
-                "12:10 After class, go to convenience store D5c for lunch",
-                "12:50 Return to dormitory D5f to rest after lunch",
-                "13:35 Depart from dormitory to library E3 for self-study",
-                "17:15 After self-study, go to cafeteria F5b for dinner",
-                "17:45 After dinner, return to library E3 for self-study",
-                "21:40 Return to dormitory D5f from library to rest"
-            ],
-            3: [
-                "08:50 Depart from dormitory D5g to classroom F3c for class",
-                "12:20 After class, go to cafeteria F5b for lunch",
-                "13:00 Return to dormitory D5g to rest after lunch",
-                "13:45 Depart from dormitory to laboratory D3d for experiment",
-                "17:25 After experiment, go to cafeteria D5b for dinner",
-                "18:00 After dinner, go to library E3 for self-study",
-                "21:55 Return to dormitory D5g from library to rest"
-            ],
-            4: [
-                "09:00 Depart from dormitory D5f to classroom F3c for class",
-                "13:00 After class, go to cafeteria D5b for lunch",
-                "13:30 Return to dormitory D5f to rest after lunch",
-                "14:15 Depart from dormitory to library E3 for self-study",
-                "17:45 After self-study, go to cafeteria B1e for dinner",
-                "18:20 After dinner, return to library E3 for self-study",
-                "22:20 Return to dormitory D5f from library to rest"
-            ],
-            5: [
-                "09:10 Depart from dormitory D5e to classroom D3a for class",
-                "13:10 After class, go to Xiao Mian restaurant for lunch",
-                "13:40 Return to dormitory D5e to rest after lunch",
-                "14:25 Depart from dormitory to classroom F3b for class",
-                "18:05 After class, go to McDonald's for dinner",
-                "18:35 After dinner, go to library E3 for self-study",
-                "22:20 Return to dormitory D5e from library to rest"
-            ],
-            6: [
-                "10:30 Depart from dormitory D5f to classroom F3c for class",
-                "12:10 After class, go to cafeteria B1e for lunch",
-                "12:55 Return to dormitory D5f to rest after lunch",
-                "13:40 Depart from dormitory to gymnasium D6 East",
-                "16:00 Return to dormitory D5f after PE class",
-                "17:00 Depart again to cafeteria B1e for dinner",
-                "17:45 Return to dormitory D5f after dinner"
-            ],
-            7: [
-                "09:30 Depart from dormitory D5f to classroom F3b as teaching assistant",
-                "10:20 Return to dormitory D5f to review latest research papers",
-                "12:00 Depart from dormitory to cafeteria B1e for lunch",
-                "12:40 Return to dormitory D5f to rest after lunch",
-                "17:20 Depart from dormitory to cafeteria B1e for dinner",
-                "17:50 After dinner, proceed to gymnasium D6 for exercise",
-                "19:25 Return to dormitory D5f for deep learning experiments"
-            ]
-        }
-        student_info = {
-            1: {
-                "major": "Intelligent Manufacturing",
-                "color": "red",
-                "type": "point"
-            },
-            2: {
-                "major": "Future Technology",
-                "color": "green",
-                "type": "point"
-            },
-            3: {
-                "major": "Microelectronics",
-                "color": "blue",
-                "type": "point"
-            },
-            4: {
-                "major": "Biomedical Engineering",
-                "color": "purple",
-                "type": "point"
-            },
-            5: {
-                "major": "Integrated Circuits",
-                "color": "orange",
-                "type": "point"
-            },
-            6: {
-                "major": "Professor A",
-                "color": "yellow",
-                "type": "square"
-            },
-            7: {
-                "major": "Professor B",
-                "color": "brown",
-                "type": "square"
-            }
-        }
-
-        schedule_text = "====== Student & Professor Schedule ======\n\n"
+        """Schedule window, one row per leg, only the visible rows are rendered"""
+        schedules = self.schedules
+        # the descriptions only belong to the built-in agents, not generated ones
+        default_agents = schedules is DEFAULT_SCHEDULES
+
+        agent_ids = np.array(sorted(schedules), dtype=np.int32)
+        counts = np.array([len(schedules[a]) for a in agent_ids.tolist()], dtype=np.int64)
+        agents = np.repeat(agent_ids, counts)
+        legs = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        def get_row(i):
+            agent, leg = int(agents[i]), int(legs[i])
+            time_str, start_node, end_node = schedules[agent][leg]
+            info = DEFAULT_AGENT_INFO.get(agent) if default_agents else None
+            who = f"{info['major']} ({info['color']} {info['type']})" if info else "Student"
+            notes = DEFAULT_AGENT_ACTIVITIES.get(agent, ()) if default_agents else ()
+            activity = notes[leg].split(" ", 1)[1] if leg < len(notes) else ""
+            return agent, who, time_str, start_node, end_node, activity
+
+        sort_columns = {"agent": agents}
+
+        def sort_values(key):
+            if key not in sort_columns:
+                # built on first use, opening the window stays cheap
+                rows = [schedules[a][l] for a, l in zip(agents.tolist(), legs.tolist())]
+                if key == "time":
+                    sort_columns[key] = np.array([parse_time(r[0]) for r in rows])
+                else:
+                    sort_columns[key] = np.array([r[1 if key == "from" else 2] for r in rows])
+            return sort_columns[key]
 
-        for student_id, info in student_info.items():
-            if student_id <= 5:
-                schedule_text += f"Student {student_id}:\n"
-                schedule_text += f"Major: {info['major']}\n"
-                schedule_text += f"Represented by a {info['color']} {info['type']}\n"
-            else:
-                schedule_text += f"{info['major']}:\n"
-                schedule_text += f"Represented by a {info['color']} {info['type']}\n"
-
-            # 修改这部分代码，直接打印字符串
-            schedule = student_schedules.get(student_id, [])
-            if schedule:
-                schedule_text += "Daily Schedule:\n"
-                for activity in schedule:
-                    schedule_text += f"{activity}\n"
-            schedule_text += "\n"
-
-        # 创建新窗口显示日程表
         schedule_window = tk.Toplevel(self.root)
         schedule_window.title("Schedule Information")
-        schedule_window.geometry("600x800")
-
-        text_widget = tk.Text(schedule_window, wrap=tk.WORD, padx=10, pady=10)
-        text_widget.pack(fill=tk.BOTH, expand=True)
-        text_widget.insert(tk.END, schedule_text)
-        text_widget.config(state=tk.DISABLED)
-
-        scrollbar = ttk.Scrollbar(schedule_window, command=text_widget.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        text_widget.config(yscrollcommand=scrollbar.set)
+        schedule_window.geometry("900x600")
 
-    def move_all_students(self):
+        filter_frame = ttk.Frame(schedule_window)
+        filter_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        ttk.Label(filter_frame, text=f"Agents: {len(agent_ids)}   Legs: {len(agents)}").pack(side=tk.LEFT)
+        agent_var = tk.StringVar()
+        ttk.Label(filter_frame, text="  Agent:").pack(side=tk.LEFT)
+        ttk.Entry(filter_frame, textvariable=agent_var, width=8).pack(side=tk.LEFT)
 
-        # all schedules
-        student_schedules = {
-            1: [("08:10", 31, 73), ("12:00", 73, 50), ("12:40", 50, 31), ("13:25", 31, 72), ("17:05", 72, 33),
-                ("17:35", 33, 64), ("21:30", 64, 31)],
-            2: [("08:20", 26, 72), ("12:10", 72, 32), ("12:50", 32, 26), ("13:35", 26, 64), ("17:15", 64, 50),
-                ("17:45", 50, 64), ("21:40", 64, 26)],
-            3: [("08:30", 27, 68), ("12:20", 68, 50), ("13:00", 50, 27), ("13:45", 27, 55), ("17:25", 55, 33),
-                ("18:00", 33, 64), ("21:55", 64, 27)],
-            4: [("09:00", 26, 67), ("13:00", 67, 50), ("13:30", 50, 26), ("14:15", 26, 64), ("17:45", 64, 103),
-                ("18:20", 103, 64), ("22:20", 64, 26)],
-            5: [("09:10", 31, 59), ("13:10", 59, 76), ("13:40", 76, 31), ("14:25", 31, 73), ("18:05", 73, 39),
-                ("18:35", 39, 120), ("22:35", 120, 31)],
-            6: [("08:30", 26, 67), ("12:10", 67, 103), ("12:55", 103, 26), ("13:40", 26, 135), ("15:00", 135, 26),
-                ("15:00", 26, 103), ("15:15", 103, 26)],
-            7: [("08:30", 26, 73), ("10:20", 73, 26), ("12:00", 26, 103), ("12:40", 103, 26), ("17:20", 26, 103),
-                ("17:50", 103, 133), ("19:25", 133, 26)]
-        }
-        if not self.simulation_running:
-            return
+        columns = [("agent", "Agent", 60), ("who", "Who", 220), ("time", "Time", 60),
+                   ("from", "From", 60), ("to", "To", 60), ("activity", "Activity", 400)]
+        sort_state = {"key": None, "descending": False}
 
-        def move_student(student_id, schedule, schedule_index=0):
-            if schedule_index >= len(schedule):
+        def on_sort(key):
+            if key not in ("agent", "time", "from", "to"):
                 return
+            sort_state["descending"] = sort_state["key"] == key and not sort_state["descending"]
+            sort_state["key"] = key
+            view.sort_by(sort_values(key), sort_state["descending"])
 
-            target_time_str, start_node, end_node = schedule[schedule_index]
-            target_hours, target_minutes = map(int, target_time_str.split(':'))
-
-            def check_and_move():
-                current_time = self.map_hours * 60 + self.map_minutes
-                target_time = target_hours * 60 + target_minutes
-
-                if abs(current_time - target_time) <= 1:
-                    if not hasattr(self, 'moving_students'):
-                        self.moving_students = set()
-
-                    if student_id in self.moving_students:
-                        self.root.after(200, check_and_move)
-                        return
-
-                    self.moving_students.add(student_id)
-                    start_idx = start_node - 1
-                    end_idx = end_node - 1
-
-                    def movement_complete():
-                        self.moving_students.remove(student_id)
-                        move_student(student_id, schedule, schedule_index + 1)
+        def apply_filter(*_):
+            try:
+                agent = int(agent_var.get())
+            except ValueError:
+                view.set_rows(np.arange(len(agents)))
+            else:
+                view.set_rows(np.flatnonzero(agents == agent))
+            if sort_state["key"]:
+                view.sort_by(sort_values(sort_state["key"]), sort_state["descending"])
 
-                    self.move_along_floyd_path(
-                        start_idx,
-                        end_idx,
-                        self.floyd_matrix,
-                        student_id,
-                        callback=movement_complete
-                    )
-                else:
-                    self.root.after(200, check_and_move)
+        view = VirtualTable(schedule_window, columns, get_row, on_sort=on_sort)
+        view.pack(fill=tk.BOTH, expand=True)
+        agent_var.trace_add("write", apply_filter)
+        apply_filter()
 
-            check_and_move()
+    def move_all_students(self):
 
+        # all schedules, shared with the headless engine
+        student_schedules = self.schedules
+        if not self.simulation_running:
+            return
 
-        for student_id, schedule in student_schedules.items():
-            self.root.after(1000 * (student_id - 1),
-                            lambda sid=student_id, s=schedule: move_student(sid, s))
+        # one queue keyed by departure time, popped by the clock tick, so an
+        # agent costs nothing until its next departure is due
+        current_time = self.clock.now()
+        self.router.ensure(self.floyd_matrix)
+        self.discard_engine()
+        self.sim_engine = SimulationEngine(self.router, student_schedules, start_minute=current_time,
+                                           store=self.agents)
+        self.sim_engine.subscribe(self.on_sim_event)
+        self.sim_engine.advance_to(current_time)
 
         self.start_time_update()
 
+    def on_sim_event(self, event):
+        """Follow the engine: animate every departure and congestion detour"""
+        if event.kind in ("depart", "reroute"):
+            # a late tick catches up: the walk starts where it would be by now
+            late_ms = max(0.0, self.clock.minute - event.time) * SECONDS_PER_MINUTE * 1000
+            # under congestion the engine times every edge as the agent enters it
+            edge_ms = math.inf if self.sim_engine.congestion else 800
+            self.animate_route(list(event.path), event.agent, elapsed_ms=late_ms, edge_ms=edge_ms)
+        elif event.kind == "no_path":
+            if event.agent in getattr(self, 'moving_points', {}):
+                # stuck at a closed edge, stop waiting for it
+                self.animator.stop(self.moving_points[event.agent])
+            print(f"Student {event.agent}: no path from node {event.node + 1} at "
+                  f"{int(event.time) // 60}:{int(event.time) % 60:02d}")
+
     def log_movement(self, student_id, current_time, target_time):
         print(f"Student {student_id}: Current time: {current_time // 60}:{current_time % 60:02d}, "
               f"Target time: {target_time // 60}:{target_time % 60:02d}")
@@ -436,18 +581,24 @@ class CampusGUI:
     def reset_simulation(self):
 
         self.simulation_running = True
+        if self.clock.running:
+            self.toggle_pause()
+        self.pause_button.configure(text="Pause")
         self.map_hours = 7
         self.map_minutes = 0
+        self.clock.reset(self.map_hours * 60 + self.map_minutes)
+        self.discard_engine()
         self.update_time_display()
         self.status_text.delete(1.0, tk.END)
         if hasattr(self, 'start_button'):
             self.start_button.configure(state=tk.NORMAL)
 
-    def draw_path(self, path_nodes, student_id=1):
+    def draw_path(self, path_nodes, student_id=1, route=None):
         """
         Args:
             path_nodes: node list
             student_id: student ID（1-5）
+            route: routing.Route of path_nodes if already at hand
         """
         colors = {
             1: "red",
@@ -458,57 +609,40 @@ class CampusGUI:
         }
         path_color = colors.get(student_id, "red")
 
-        if not hasattr(self, 'path_lines_dict'):
-            self.path_lines_dict = {}
-
-        if student_id in self.path_lines_dict:
-            for line in self.path_lines_dict[student_id]:
-                self.canvas.delete(line)
-        self.path_lines_dict[student_id] = []
-
-        for i in range(len(path_nodes) - 1):
-            start_node = path_nodes[i] + 1
-            end_node = path_nodes[i + 1] + 1
-
-            if start_node in self.node_positions and end_node in self.node_positions:
-                start_pos = self.node_positions[start_node]
-                end_pos = self.node_positions[end_node]
-
-                line = self.canvas.create_line(
-                    start_pos[0], start_pos[1],
-                    end_pos[0], end_pos[1],
-                    fill=path_color,
-                    width=2,
-                    dash=(5, 2),
-                    tags=(f'path_line_{student_id}',)
-                )
-                self.path_lines_dict[student_id].append(line)
+        if route is None:
+            route = self.route_cache.geometry(path_nodes)
+        points = route.points.ravel().tolist()
+
+        # one polyline per agent, moved to the new route with coords
+        line = self.route_lines.get(student_id)
+        if line is not None and not self.canvas.type(line):
+            line = None  # deleted from the canvas meanwhile
+        if len(points) < 4:
+            if line is not None:
+                self.canvas.itemconfig(line, state=tk.HIDDEN)
+            return
 
-    def floydWarshall(self, graph):
+        if line is None:
+            line = self.canvas.create_line(
+                *points,
+                fill=path_color,
+                width=2,
+                dash=(5, 2),
+                tags=self.layers.tags("routes", f'path_line_{student_id}')
+            )
+            self.layers.place("routes", line)
+            self.route_lines[student_id] = line
+        else:
+            self.canvas.coords(line, *points)
+            self.canvas.itemconfig(line, state=tk.NORMAL)
 
-        V = len(graph)
-        dist = graph.copy()
-        path = [[j if graph[i][j] != float('inf') else -1 for j in range(V)] for i in range(V)]
+    def floydWarshall(self, graph):
 
-        for k in range(V):
-            for i in range(V):
-                for j in range(V):
-                    if dist[i][k] != float('inf') and dist[k][j] != float('inf'):
-                        if dist[i][j] > dist[i][k] + dist[k][j]:
-                            dist[i][j] = dist[i][k] + dist[k][j]
-                            path[i][j] = path[i][k]
-        return dist, path
+        return floyd_warshall(graph)
 
     def get_path(self, path_matrix, start, end):
 
-        if path_matrix[start][end] == -1:
-            return []
-
-        path = [start]
-        while start != end:
-            start = path_matrix[start][end]
-            path.append(start)
-        return path
+        return get_path(path_matrix, start, end)
 
     def move_along_floyd_path(self, start_node_idx, end_node_idx, floyd_matrix, student_id=1, callback=None):
         """
@@ -518,46 +652,34 @@ class CampusGUI:
             floyd_matrix
             student_id: (1-5)，默认为1保持向后兼容
         """
-        # shortest path
-        dist_matrix, path_matrix = self.floydWarshall(floyd_matrix)
+        # shortest path, solved once per matrix by the router
+        self.router.ensure(floyd_matrix)
 
-        # complete path
-        path = self.get_path(path_matrix, start_node_idx, end_node_idx)
+        # complete path, repeated trips come from the route cache
+        route = self.route_cache.route(start_node_idx, end_node_idx)
 
-        if not path:
+        if not route.nodes:
             messagebox.showerror("error", "No path found")
             return
 
-        # real node pos
-        path_positions = []
-        for node_idx in path:
-            actual_node = node_idx + 1
-            if actual_node in self.node_positions:
-                path_positions.append(self.node_positions[actual_node])
+        self.animate_route(route.nodes, student_id, callback)
+
+    def animate_route(self, path, student_id=1, callback=None, elapsed_ms=0.0, edge_ms=800):
+        """Draw path (0-based node indexes) and walk student_id along it, elapsed_ms already walked"""
+        # polyline built once per route and graph version, shared with draw_path
+        route = self.route_cache.geometry(path)
+        path_positions = route.points
 
         # color the path
-        self.draw_path(path, student_id)
+        self.draw_path(path, student_id, route)
 
         start_pos = path_positions[0]
         if not hasattr(self, 'moving_points') or student_id not in self.moving_points:
             self.create_moving_point(*start_pos, student_id)
-        else:
-            point = self.moving_points[student_id]
-            self.canvas.coords(point,
-                               start_pos[0] - 3, start_pos[1] - 3,
-                               start_pos[0] + 3, start_pos[1] + 3)
-
-        def animate_movement(position_index=0):
-            if position_index < len(path_positions) - 1:
-                start = path_positions[position_index]
-                end = path_positions[position_index + 1]
-                self.move_point_along_path(start, end, student_id, duration=500)
-                self.animation_id = self.root.after(800,
-                                                    lambda: animate_movement(position_index + 1))
-            elif callback:
-                callback()
+        point = self.moving_points[student_id]
 
-        animate_movement()
+        # edge_ms per edge, advanced by the shared frame loop
+        self.animator.start(point, path_positions, edge_ms, callback, row=student_id - 1, elapsed_ms=elapsed_ms)
 
     def parse_path_matrix(self, matrix_str: str) -> List[List[int]]:
 
@@ -580,159 +702,21 @@ class CampusGUI:
         return []
 
     def set_node_positions(self):
-        self.node_positions = {
-            1: (315, 175),  # node1
-            2: (415, 175),  # node2
-            3: (515, 175),  # node3
-            4: (615, 175),  # node4
-            5: (315, 285),  # node5
-            6: (415, 285),  # node6
-            7: (515, 285),  # node7
-            8: (615, 285),  # node8
-            9: (355, 285),  # node9
-            10: (445, 285),  # node10
-            11: (485, 285),  # node11
-            12: (575, 285),  # node12
-            13: (315, 365),  # node13
-            14: (355, 365),  # node14
-            15: (415, 365),  # node15
-            16: (445, 365),  # node16
-            17: (485, 365),  # node17
-            18: (515, 365),  # node18
-            19: (575, 365),  # node19
-            20: (615, 365),  # node20
-            21: (315, 470),  # node21
-            22: (415, 470),  # node22
-            23: (515, 470),  # node23
-            24: (615, 470),  # node24
-            25: (315, 190),  # node25
-            26: (330, 190),  # node26
-            27: (370, 180),  # node27
-            28: (370, 175),  # node28
-            29: (330, 220),  # node29
-            30: (315, 220),  # node30
-            31: (370, 215),  # node31
-            32: (370, 245),  # node32
-            33: (330, 250),  # node33
-            34: (330, 285),  # node34
-            35: (415, 245),  # node35
-            36: (415, 215),  # node36
-            37: (415, 180),  # node37
-            38: (415, 180),  # node38
-            39: (465, 210),  # node39
-            40: (465, 285),  # node40
-            41: (515, 185),  # node41
-            42: (515, 215),  # node42
-            43: (515, 210),  # node43
-            44: (515, 245),  # node44
-            45: (530, 185),  # node45
-            46: (530, 215),  # node46
-            47: (530, 245),  # node47
-            48: (570, 175),  # node48
-            49: (570, 210),  # node49
-            50: (570, 240),  # node50
-            51: (570, 285),  # node51
-            52: (370, 365),  # node52
-            53: (315, 380),  # node53
-            54: (330, 380),  # node54
-            55: (370, 380),  # node55
-            56: (415, 380),  # node56
-            57: (350, 400),  # node57
-            58: (315, 420),  # node58
-            59: (330, 420),  # node59
-            60: (370, 420),  # node60
-            61: (415, 420),  # node61
-            62: (370, 470),  # node62
-            63: (430, 365),  # node63
-            64: (430, 380),  # node64
-            65: (570, 365),  # node65
-            66: (515, 380),  # node66
-            67: (530, 380),  # node67
-            68: (570, 380),  # node68
-            69: (615, 380),  # node69
-            70: (550, 400),  # node70
-            71: (515, 420),  # node71
-            72: (530, 420),  # node72
-            73: (570, 420),  # node73
-            74: (615, 420),  # node74
-            75: (570, 470),  # node75
-            76: (435, 180),  # node76
-            77: (220, 285),  # node77
-            78: (158, 365),  # node78
-            79: (147, 390),  # node79
-            80: (158, 390),  # node80
-            81: (142, 410),  # node81
-            82: (65, 370),  # node82
-            83: (125, 457),  # node83
-            84: (148, 470),  # node84
-            85: (158, 470),  # node85
-            86: (220, 470),  # node86
-            87: (220, 365),  # node87
-            88: (235, 275),  # node88
-            89: (280, 275),  # node89
-            90: (235, 315),  # node90
-            91: (280, 330),  # node91
-            92: (235, 345),  # node92
-            93: (220, 315),  # node93
-            94: (220, 345),  # node94
-            95: (315, 375),  # node95
-            96: (315, 430),  # node96
-            97: (235, 470),  # node97
-            98: (280, 470),  # node98
-            99: (235, 500),  # node99
-            100: (280, 520),  # node100
-            101: (235, 540),  # node101
-            102: (220, 540),  # node102
-            103: (125, 475),  # node103
-            104: (175, 520),  # node104
-            105: (135, 540),  # node105
-            106: (100, 510),  # node106
-            107: (100, 540),  # node107
-            108: (136, 463),  # node108
-            109: (95, 500),  # node109
-            110: (90, 510),  # node110
-            111: (90, 540),  # node111
-            112: (90, 600),  # node112
-            113: (135, 600),  # node113
-            114: (220, 600),  # node114
-            115: (315, 600),  # node115
-            116: (330, 500),  # node116
-            117: (330, 540),  # node117
-            118: (370, 520),  # node118
-            119: (415, 600),  # node119
-            120: (425, 500),  # node120
-            121: (425, 470),  # node121
-            122: (515, 500),  # node122
-            123: (515, 540),  # node123
-            124: (515, 600),  # node124
-            125: (530, 500),  # node125
-            126: (530, 540),  # node126
-            127: (570, 520),  # node127
-            128: (615, 600),  # node128
-            129: (210, 185),  # node129
-            130: (252, 250),  # node130
-            131: (315, 70),  # node131
-            132: (415, 70),  # node132
-            133: (320, 77),  # node133
-            134: (315, 77),  # node134
-            135: (320, 175),  # node135
-            136: (235, 365)  # node136
-        }
+        self.node_positions = dict(NODE_POSITIONS)
+        self.node_index = NodeIndex(self.node_positions)
+        if self.route_cache.node_positions != self.node_positions:
+            # cached polylines were built from the old coordinates
+            self.route_cache.clear()
+        self.route_cache.node_positions = self.node_positions
 
     def move_along_path(self, path: List[int]):
 
         if not path or len(path) < 2:
             return
 
-        def move_next(index=0):
-            if index < len(path) - 1:
-                start = self.node_positions[path[index]]
-                end = self.node_positions[path[index + 1]]
-                self.move_point_along_path(start, end, duration=1000)
-                self.root.after(1100, lambda: move_next(index + 1))
-
+        positions = [self.node_positions[node] for node in path]
 
-        start_pos = self.node_positions[path[0]]
+        start_pos = positions[0]
         if self.moving_point is None:
             self.create_moving_point(*start_pos)
         else:
@@ -742,7 +726,7 @@ class CampusGUI:
                                start_pos[0] + 3, start_pos[1] + 3)
 
         # start
-        self.root.after(800, lambda: move_next())
+        self.root.after(800, lambda: self.animator.start(self.moving_point, positions, 1100))
 
     def create_main_frame(self):
 
@@ -807,6 +791,39 @@ class CampusGUI:
         self.end_node_entry = ttk.Entry(end_frame, width=5)
         self.end_node_entry.pack(side=tk.LEFT, padx=5)
 
+        # routing backend
+        router_frame = ttk.Frame(self.path_input_frame)
+        router_frame.pack(fill=tk.X, padx=5, pady=2)
+        ttk.Label(router_frame, text="Routing:").pack(side=tk.LEFT)
+        self.router_var = tk.StringVar(value="floyd")
+        router_box = ttk.Combobox(
+            router_frame,
+            textvariable=self.router_var,
+            values=list(ROUTERS),
+            state="readonly",
+            width=10
+        )
+        router_box.pack(side=tk.LEFT, padx=5)
+        router_box.bind("<<ComboboxSelected>>", lambda e: self.set_router(self.router_var.get()))
+
+        # click on the map fills the start, then the end node
+        self.pick_var = tk.BooleanVar(value=False)
+        self.pick_next = "start"
+        ttk.Checkbutton(
+            self.path_input_frame,
+            text="Pick nodes on map",
+            variable=self.pick_var
+        ).pack(anchor=tk.W, padx=5, pady=2)
+
+        # slower stairs and slopes, applied edge by edge without a new all-pairs solve
+        self.rain_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            self.path_input_frame,
+            text="Rain (stairs/slopes x2)",
+            variable=self.rain_var,
+            command=lambda: self.set_rain(self.rain_var.get())
+        ).pack(anchor=tk.W, padx=5, pady=2)
+
         button_frame = ttk.Frame(self.path_input_frame)
         button_frame.pack(fill=tk.X, padx=5, pady=2)
 
@@ -873,7 +890,7 @@ class CampusGUI:
             start_idx = start_node - 1
             end_idx = end_node - 1
 
-            self.move_along_floyd_path(start_idx, end_idx, floyd_matrix)
+            self.move_along_floyd_path(start_idx, end_idx, self.floyd_matrix)
 
         except ValueError:
             messagebox.showerror("error", "Please input valid node")
@@ -888,35 +905,30 @@ class CampusGUI:
                 start = self.node_positions[self.current_path[i]]
                 end = self.node_positions[self.current_path[i + 1]]
 
-                line = self.canvas.create_line(
+                self.canvas.create_line(
                     start[0], start[1],
                     end[0], end[1],
                     fill='#FF6B6B', # red
                     width=3,
                     dash=(5, 3),
-                    tags=('path_preview',)
+                    tags=self.layers.tags("routes", 'path_preview')
                 )
-                self.path_lines.append(line)
 
                 radius = 4
-                circle = self.canvas.create_oval(
+                self.canvas.create_oval(
                     start[0] - radius, start[1] - radius,
                     start[0] + radius, start[1] + radius,
                     fill='#FF6B6B',
                     outline='#FF6B6B',
-                    tags=('path_preview',)
+                    tags=self.layers.tags("routes", 'path_preview')
                 )
-                self.path_lines.append(circle)
 
-        self.canvas.tag_raise('path_preview')
-        if self.moving_point:
-            self.canvas.tag_raise(self.moving_point)
+            # routes sit under the agents layer, the point stays visible
+            self.layers.place("routes", 'path_preview')
 
     def clear_path_preview(self):
 
-        for line in self.path_lines:
-            self.canvas.delete(line)
-        self.path_lines = []
+        self.canvas.delete('path_preview')
 
     def toggle_path_preview(self):
 
@@ -966,22 +978,9 @@ class CampusGUI:
         # avoid been click twice
         self.start_button.configure(state=tk.DISABLED)
 
-        def move_next(index=0):
-            if index < len(self.current_path) - 1:
-                start = self.node_positions[self.current_path[index]]
-                end = self.node_positions[self.current_path[index + 1]]
-
-                if self.preview_var.get():
-                    self.canvas.tag_lower('path_preview')
-                    self.canvas.tag_raise(self.moving_point)
-
-                self.move_point_along_path(start, end, duration=100)
-                self.root.after(1000, lambda: move_next(index + 1))
-            else:
-
-                self.start_button.configure(state=tk.NORMAL)
-
-        move_next()
+        positions = [self.node_positions[node] for node in self.current_path]
+        self.animator.start(self.moving_point, positions, 1000,
+                            lambda: self.start_button.configure(state=tk.NORMAL))
 
     def create_moving_point(self, x, y, student_id=1, size=6):
         """
@@ -990,28 +989,29 @@ class CampusGUI:
             student_id: student id
             size: node size
         """
-        colors = ["red", "green", "blue", "purple", "orange", "yellow", "brown"]  # brown for professor
-        color = colors[student_id - 1] if 1 <= student_id <= len(colors) else "red"
+        info = DEFAULT_AGENT_INFO.get(student_id, {"color": "red", "type": "point"})
+        color = info["color"]
 
         if not hasattr(self, 'moving_points'):
             self.moving_points = {}
             self.moving_point = None
 
-        if student_id in [6, 7]:  # square for professor
+        if info["type"] == "square":  # square for professor
             point = self.canvas.create_rectangle(
                 x - size / 2, y - size / 2,
                 x + size / 2, y + size / 2,
                 fill=color,
-                tags=f'moving_point_{student_id}'
+                tags=self.layers.tags("agents", f'moving_point_{student_id}')
             )
         else:
             point = self.canvas.create_oval(
                 x - size / 2, y - size / 2,
                 x + size / 2, y + size / 2,
                 fill=color,
-                tags=f'moving_point_{student_id}'
+                tags=self.layers.tags("agents", f'moving_point_{student_id}')
             )
 
+        self.layers.place("agents", point)
         self.moving_points[student_id] = point
 
         if student_id == 1:
@@ -1021,7 +1021,8 @@ class CampusGUI:
 
     def create_color_block(self, x1, y1, x2, y2, color):
 
-        self.canvas.create_rectangle(x1, y1, x2, y2, fill=color)
+        block = self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, tags=self.layers.tags("background"))
+        self.layers.place("background", block)
 
     def create_map_canvas(self):
 
@@ -1035,6 +1036,8 @@ class CampusGUI:
             bg='white'
         )
         self.canvas.pack(fill=tk.BOTH, expand=True)
+        # z-order: background < edges < buildings < routes < agents < overlays
+        self.layers = CanvasLayers(self.canvas)
         self.create_color_block(150, 300, 750, 350, 'lightblue')
         self.create_color_block(315, 175, 415, 285, '#E0F8E0')
         self.create_color_block(315, 70, 415, 175, '#E0F8E0')
@@ -1064,48 +1067,48 @@ class CampusGUI:
         else:
             icon_image = self.moon_image
 
-        self.canvas.create_image(0, 0, image=icon_image, anchor=tk.NW)
+        # one icon item, only its image changes
+        if self.mode_icon is None or not self.canvas.type(self.mode_icon):
+            self.mode_icon = self.canvas.create_image(0, 0, image=icon_image, anchor=tk.NW,
+                                                      tags=self.layers.tags("overlays"))
+            self.layers.place("overlays", self.mode_icon)
+        else:
+            self.canvas.itemconfig(self.mode_icon, image=icon_image)
+
+    def building_palette(self, mode):
+        """building type -> fill color for "day" or "night", built once per mode"""
+        palette = self._palettes.get(mode)
+        if palette is None:
+            if mode == "day":
+                palette = dict(BUILDING_COLORS)
+            else:
+                palette = {t: self.darken_color(c) for t, c in BUILDING_COLORS.items()}
+            self._palettes[mode] = palette
+        return palette
+
+    def apply_building_palette(self, mode):
+        """One itemconfig per building type, all icons of a type share its tag"""
+        palette = self.building_palette(mode)
+        for building_type in self.building_types:
+            color = palette.get(building_type, palette["default"])
+            self.canvas.itemconfig(building_type_tag(building_type), fill=color)
 
     def set_day_mode(self):
 
         self.current_mode = "day"
         self.canvas.configure(bg='white')
-
-        for building in self.buildings:
-            if building._icon:
-                original_color = self.get_original_building_color(building.type)
-                self.canvas.itemconfig(building._icon, fill=original_color)
+        self.apply_building_palette("day")
         self.display_mode_icon()
 
     def get_original_building_color(self, building_type):
 
-        colors = {
-            "teaching": "#ADD8E6",
-            "dormitory": "#98FB98",
-            "canteen": "#FFB6C1",
-            "default": "#D3D3D3",
-            "innovative2": "#FFFF00",
-            "playground & gym": "#E42833",
-            "hospital": "#B245F5",
-            "academy": "#FF7F00",
-            "playground": "#0170C5",
-            "square": "#eadfb4",
-            "service center": "#b4eab5",
-            "basketball ground": "#f9b868"
-        }
-        return colors.get(building_type, colors["default"])
+        return BUILDING_COLORS.get(building_type, BUILDING_COLORS["default"])
 
     def set_night_mode(self):
 
         self.current_mode = "night"
         self.canvas.configure(bg='#1a1a1a')
-
-        for building in self.buildings:
-            if building._icon:
-                current_color = self.canvas.itemcget(building._icon, "fill")
-
-                darker_color = self.darken_color(current_color)
-                self.canvas.itemconfig(building._icon, fill=darker_color)
+        self.apply_building_palette("night")
         self.display_mode_icon()
 
     def darken_color(self, color):
@@ -1139,24 +1142,64 @@ class CampusGUI:
         self.canvas.bind("<ButtonPress-1>", self.on_press)
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        self.press_xy = None  # screen position of the last press, tells clicks from pans
 
     def on_press(self, event):
+        self.press_xy = (event.x, event.y)
         self.canvas.scan_mark(event.x, event.y)
 
     def on_drag(self, event):
         self.canvas.scan_dragto(event.x, event.y, gain=1)
 
-    def on_release(self, event):
+    def on_release(self, event, click_slop=4):
+
+        # a release after panning the map is not a click
+        if self.press_xy is None or max(abs(event.x - self.press_xy[0]), abs(event.y - self.press_xy[1])) > click_slop:
+            return
+
+        if self.pick_var.get():
+            self.pick_node(event)
+            return
 
         clicked_item = self.canvas.find_closest(event.x, event.y)
         tags = self.canvas.gettags(clicked_item)
         if "building" in tags:
             self.show_building_info(tags[1])
 
+    def pick_node(self, event, max_distance=15):
+        """Put the node nearest to the click into the start / end entry"""
+        x, y = self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
+        node = self.node_index.nearest(x, y, max_distance)
+        if node is None:
+            return
+
+        entry = self.start_node_entry if self.pick_next == "start" else self.end_node_entry
+        entry.delete(0, tk.END)
+        entry.insert(0, str(node))
+
+        self.info_text.delete(1.0, tk.END)
+        self.info_text.insert(tk.END, f"{self.pick_next.capitalize()} node: {node}\n")
+        self.pick_next = "end" if self.pick_next == "start" else "start"
+
     def add_building(self, x: int, y: int, building_type: str, name: str):
 
-        building = BuildingIcon(self.canvas, x, y, building_type, name)
-        self.buildings.append(building)
+        self.add_buildings([(x, y, building_type, name)])
+
+    def add_buildings(self, buildings):
+        """Draw (x, y, type, name) rows, e.g. campus_data.BUILDINGS, in one pass"""
+        for x, y, building_type, name in buildings:
+            self.buildings.append(BuildingIcon(self.canvas, x, y, building_type, name))
+            self.building_types.add(building_type)
+        self.layers.add("buildings", "building")
+        self.layers.add("buildings", "label")
+        if self.current_mode != "day":
+            self.apply_building_palette(self.current_mode)
+
+    def canvas_item_counts(self) -> Dict[str, int]:
+        """Canvas items per layer and in total, to watch the object budget"""
+        counts = self.layers.counts()
+        counts["total"] = len(self.canvas.find_all()) - len(self.layers.layers)
+        return counts
 
     def show_building_info(self, building_name: str):
 
@@ -1166,53 +1209,51 @@ class CampusGUI:
     def clear_map(self):
 
         self.canvas.delete("all")
+        self.layers.reset()
+        self.route_lines = {}
         self.buildings.clear()
+        self.building_types.clear()
+        self.mode_icon = None
+        self.edge_table = EdgeTable()
+        self.line_edges = {}
 
-    def draw_line(self, x1, y1, x2, y2, color="black", width=2):
+    def draw_edges(self, edges, color="black", width=2):
+        """Draw every (start_node, end_node) edge, nodes are 1-based ids"""
+        self.add_edge_lines(EdgeTable.from_edges(edges, self.node_positions), color, width)
 
-        start_node = None
-        end_node = None
-        for node_id, pos in self.node_positions.items():
-            if pos == (x1, y1):
-                start_node = node_id
-            if pos == (x2, y2):
-                end_node = node_id
-            if start_node and end_node:
-                break
+    def draw_line(self, x1, y1, x2, y2, color="black", width=2, start_node=None, end_node=None):
 
-        length = ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5
+        # O(1) lookup; draw_edges passes the ids, which also settles shared coordinates
+        if start_node is None:
+            start_node = self.node_index.at(x1, y1)
+        if end_node is None:
+            end_node = self.node_index.at(x2, y2)
 
-        if length < 50:
-            capacity = "Low (2-4 people)"
-        elif length < 100:
-            capacity = "Medium (5-7 people)"
-        else:
-            capacity = "High (8-10 people)"
+        start_node = -1 if start_node is None else start_node
+        end_node = -1 if end_node is None else end_node
+        self.add_edge_lines(EdgeTable([start_node], [end_node], [x1], [y1], [x2], [y2]), color, width)
 
-        height_diff = abs(y2 - y1)
-        if height_diff < 20:
-            difficulty = "Easy (Flat)"
-        elif height_diff < 50:
-            difficulty = "Medium (Slight Slope)"
-        else:
-            difficulty = "Hard (Stairs/Steep Slope)"
+    def add_edge_lines(self, edges: EdgeTable, color="black", width=2):
+        """Append edges to edge_table and create one canvas line per edge"""
+        first_id = len(self.edge_table)
+        self.edge_table = self.edge_table.extend(edges)
 
-        line = self.canvas.create_line(x1, y1, x2, y2, fill=color, width=width)
+        coords = zip(edges.x1.tolist(), edges.y1.tolist(), edges.x2.tolist(), edges.y2.tolist())
+        for edge_id, (x1, y1, x2, y2) in enumerate(coords, first_id):
+            line = self.canvas.create_line(x1, y1, x2, y2, fill=color, width=width,
+                                           tags=self.layers.tags("edges", "edge"))
+            self.line_edges[line] = edge_id
+        self.layers.place("edges")
 
-        self.path_infos[line] = {
-            'nodes': f"Node {start_node} to Node {end_node}",
-            'length': f"{length:.1f} units",
-            'capacity': capacity,
-            'difficulty': difficulty,
-            'coords': (x1, y1, x2, y2)
-        }
+    def on_edge_click(self, event):
 
-        self.canvas.tag_bind(line, '<Button-1>',
-                             lambda e, line_id=line: self.show_path_info(e, line_id))
+        line_id = self.canvas.find_withtag("current")
+        if line_id and line_id[0] in self.line_edges:
+            self.show_path_info(event, line_id[0])
 
     def show_path_info(self, event, line_id):
 
-        info = self.path_infos[line_id]
+        info = self.edge_table.info(self.line_edges[line_id])
         info_text = f"Path Information:\n"
         info_text += f"Path: {info['nodes']}\n"
         info_text += f"Length: {info['length']}\n"
@@ -1223,26 +1264,65 @@ class CampusGUI:
         self.info_text.insert(tk.END, info_text)
 
     def show_all_paths_info(self):
+        """All paths window, sortable and filterable, only the visible rows are rendered"""
+        table = self.edge_table
 
         paths_window = tk.Toplevel(self.root)
         paths_window.title("All Paths Information")
-        paths_window.geometry("400x600")
-
-        text_widget = tk.Text(paths_window, wrap=tk.WORD, padx=10, pady=10)
-        scrollbar = ttk.Scrollbar(paths_window, command=text_widget.yview)
-        text_widget.configure(yscrollcommand=scrollbar.set)
-
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-
-        text_widget.insert(tk.END, "=== Campus Paths Information ===\n\n")
-        for line_id, info in self.path_infos.items():
-            text_widget.insert(tk.END, f"{info['nodes']}:\n")
-            text_widget.insert(tk.END, f"Length: {info['length']}\n")
-            text_widget.insert(tk.END, f"Capacity: {info['capacity']}\n")
-            text_widget.insert(tk.END, f"Difficulty: {info['difficulty']}\n\n")
+        paths_window.geometry("620x600")
+
+        filter_frame = ttk.Frame(paths_window)
+        filter_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        capacity_var = tk.StringVar(value="All")
+        difficulty_var = tk.StringVar(value="All")
+        min_length_var = tk.StringVar()
+        ttk.Label(filter_frame, text="Capacity:").pack(side=tk.LEFT)
+        ttk.Combobox(filter_frame, textvariable=capacity_var, values=("All",) + CAPACITY_LABELS,
+                     state="readonly", width=18).pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text=" Difficulty:").pack(side=tk.LEFT)
+        ttk.Combobox(filter_frame, textvariable=difficulty_var, values=("All",) + DIFFICULTY_LABELS,
+                     state="readonly", width=22).pack(side=tk.LEFT)
+        ttk.Label(filter_frame, text=" Min length:").pack(side=tk.LEFT)
+        ttk.Entry(filter_frame, textvariable=min_length_var, width=6).pack(side=tk.LEFT)
+        count_label = ttk.Label(filter_frame)
+        count_label.pack(side=tk.RIGHT)
+
+        def get_row(i):
+            info = table.info(i)
+            return info['nodes'], info['length'], info['capacity'], info['difficulty']
+
+        columns = [("edge", "Path", 150), ("length", "Length", 80),
+                   ("capacity", "Capacity", 140), ("difficulty", "Difficulty", 180)]
+        sort_columns = {"edge": table.start, "length": table.length,
+                        "capacity": table.capacity, "difficulty": table.difficulty}
+        sort_state = {"key": None, "descending": False}
+
+        def on_sort(key):
+            sort_state["descending"] = sort_state["key"] == key and not sort_state["descending"]
+            sort_state["key"] = key
+            view.sort_by(sort_columns[key], sort_state["descending"])
+
+        def apply_filter(*_):
+            mask = np.ones(len(table), dtype=bool)
+            if capacity_var.get() in CAPACITY_LABELS:
+                mask &= table.capacity == CAPACITY_LABELS.index(capacity_var.get())
+            if difficulty_var.get() in DIFFICULTY_LABELS:
+                mask &= table.difficulty == DIFFICULTY_LABELS.index(difficulty_var.get())
+            try:
+                mask &= table.length >= float(min_length_var.get())
+            except ValueError:
+                pass
+            view.set_rows(np.flatnonzero(mask))
+            if sort_state["key"]:
+                view.sort_by(sort_columns[sort_state["key"]], sort_state["descending"])
+            count_label.config(text=f"{len(view.order)} / {len(table)} paths")
+
+        view = VirtualTable(paths_window, columns, get_row, on_sort=on_sort)
+        view.pack(fill=tk.BOTH, expand=True)
+        for var in (capacity_var, difficulty_var, min_length_var):
+            var.trace_add("write", apply_filter)
+        apply_filter()
 
-        text_widget.config(state=tk.DISABLED)
     def move_point_along_path(self, start_pos, end_pos, student_id=1, duration=200):
         """
         Args:
@@ -1272,422 +1352,31 @@ class CampusGUI:
     def create_route(self):
         self.set_node_positions()
 
-        node1_x, node1_y = 315, 175
-        node2_x, node2_y = 415, 175
-        node3_x, node3_y = 515, 175
-        node4_x, node4_y = 615, 175
-        node5_x, node5_y = 315, 285
-        node6_x, node6_y = 415, 285
-        node7_x, node7_y = 515, 285
-        node8_x, node8_y = 615, 285
-        node9_x, node9_y = 355, 285
-        node10_x, node10_y = 445, 285
-        node11_x, node11_y = 485, 285
-        node12_x, node12_y = 575, 285
-        node13_x, node13_y = 315, 365
-        node14_x, node14_y = 355, 365
-        node15_x, node15_y = 415, 365
-        node16_x, node16_y = 445, 365
-        node17_x, node17_y = 485, 365
-        node18_x, node18_y = 515, 365
-        node19_x, node19_y = 575, 365
-        node20_x, node20_y = 615, 365
-        node21_x, node21_y = 315, 470
-        node22_x, node22_y = 415, 470
-        node23_x, node23_y = 515, 470
-        node24_x, node24_y = 615, 470
-        node25_x, node25_y = 315, 190
-        node26_x, node26_y = 330, 190
-        node27_x, node27_y = 370, 180
-        node28_x, node28_y = 370, 175
-        node29_x, node29_y = 330, 220
-        node30_x, node30_y = 315, 220
-        node31_x, node31_y = 370, 215
-        node32_x, node32_y = 370, 245
-        node33_x, node33_y = 330, 250
-        node34_x, node34_y = 330, 285
-        node35_x, node35_y = 415, 245
-        node36_x, node36_y = 415, 215
-        node37_x, node37_y = 415, 180
-        node38_x, node38_y = 415, 180
-        node39_x, node39_y = 465, 210
-        node40_x, node40_y = 465, 285
-        node41_x, node41_y = 515, 185
-        node42_x, node42_y = 515, 215
-        node43_x, node43_y = 515, 210
-        node44_x, node44_y = 515, 245
-        node45_x, node45_y = 530, 185
-        node46_x, node46_y = 530, 215
-        node47_x, node47_y = 530, 245
-        node48_x, node48_y = 570, 175
-        node49_x, node49_y = 570, 210
-        node50_x, node50_y = 570, 240
-        node51_x, node51_y = 570, 285
-        node52_x, node52_y = 370, 365
-        node53_x, node53_y = 315, 380
-        node54_x, node54_y = 330, 380
-        node55_x, node55_y = 370, 380
-        node56_x, node56_y = 415, 380
-        node57_x, node57_y = 350, 400
-        node58_x, node58_y = 315, 420
-        node59_x, node59_y = 330, 420
-        node60_x, node60_y = 370, 420
-        node61_x, node61_y = 415, 420
-        node62_x, node62_y = 370, 470
-        node63_x, node63_y = 430, 365
-        node64_x, node64_y = 430, 380
-        node65_x, node65_y = 570, 365
-        node66_x, node66_y = 515, 380
-        node67_x, node67_y = 530, 380
-        node68_x, node68_y = 570, 380
-        node69_x, node69_y = 615, 380
-        node70_x, node70_y = 550, 400
-        node71_x, node71_y = 515, 420
-        node72_x, node72_y = 530, 420
-        node73_x, node73_y = 570, 420
-        node74_x, node74_y = 615, 420
-        node75_x, node75_y = 570, 470
-        node76_x, node76_y = 435, 180
-        node77_x, node77_y = 220, 285
-        node78_x, node78_y = 158, 365
-        node79_x, node79_y = 147, 390
-        node80_x, node80_y = 158, 390
-        node81_x, node81_y = 142, 410
-        node82_x, node82_y = 65, 370
-        node83_x, node83_y = 125, 457
-        node84_x, node84_y = 148, 470
-        node85_x, node85_y = 158, 470
-        node86_x, node86_y = 220, 470
-        node87_x, node87_y = 220, 365
-        node88_x, node88_y = 235, 375
-        node89_x, node89_y = 280, 375
-        node90_x, node90_y = 235, 415
-        node91_x, node91_y = 280, 430
-        node92_x, node92_y = 235, 445
-        node93_x, node93_y = 220, 415
-        node94_x, node94_y = 220, 445
-        node95_x, node95_y = 315, 375
-        node96_x, node96_y = 315, 430
-        node97_x, node97_y = 235, 470
-        node98_x, node98_y = 280, 470
-        node99_x, node99_y = 235, 500
-        node100_x, node100_y = 280, 520
-        node101_x, node101_y = 235, 540
-        node102_x, node102_y = 220, 540
-        node103_x, node103_y = 125, 475
-        node104_x, node104_y = 175, 520
-        node105_x, node105_y = 135, 540
-        node106_x, node106_y = 100, 510
-        node107_x, node107_y = 100, 540
-        node108_x, node108_y = 136, 463
-        node109_x, node109_y = 95, 500
-        node110_x, node110_y = 90, 510
-        node111_x, node111_y = 90, 540
-        node112_x, node112_y = 90, 600
-        node113_x, node113_y = 135, 600
-        node114_x, node114_y = 220, 600
-        node115_x, node115_y = 315, 600
-        node116_x, node116_y = 330, 500
-        node117_x, node117_y = 330, 540
-        node118_x, node118_y = 370, 520
-        node119_x, node119_y = 415, 600
-        node120_x, node120_y = 425, 500
-        node121_x, node121_y = 425, 470
-        node122_x, node122_y = 515, 500
-        node123_x, node123_y = 515, 540
-        node124_x, node124_y = 515, 600
-        node125_x, node125_y = 530, 500
-        node126_x, node126_y = 530, 540
-        node127_x, node127_y = 570, 520
-        node128_x, node128_y = 615, 600
-        node129_x, node129_y = 210, 185
-        node130_x, node130_y = 252, 250
-        node131_x, node131_y = 315, 70
-        node132_x, node132_y = 415, 70
-        node133_x, node133_y = 320, 77
-        node134_x, node134_y = 315, 77
-        node135_x, node135_y = 320, 175
-        node136_x, node136_y = 235, 365
-
-        self.draw_line(node1_x, node1_y, node2_x, node2_y)
-        self.draw_line(node2_x, node2_y, node3_x, node3_y)
-        self.draw_line(node3_x, node3_y, node4_x, node4_y)
-        self.draw_line(node1_x, node1_y, node5_x, node5_y)
-        self.draw_line(node2_x, node2_y, node6_x, node6_y)
-        self.draw_line(node3_x, node3_y, node7_x, node7_y)
-        self.draw_line(node4_x, node4_y, node8_x, node8_y)
-        self.draw_line(node5_x, node5_y, node9_x, node9_y)
-        self.draw_line(node9_x, node9_y, node6_x, node6_y)
-        self.draw_line(node6_x, node6_y, node10_x, node10_y)
-        self.draw_line(node10_x, node10_y, node11_x, node11_y)
-        self.draw_line(node11_x, node11_y, node7_x, node7_y)
-        self.draw_line(node7_x, node7_y, node12_x, node12_y)
-        self.draw_line(node12_x, node12_y, node8_x, node8_y)
-        self.draw_line(node9_x, node9_y, node14_x, node14_y)
-        self.draw_line(node10_x, node10_y, node16_x, node16_y)
-        self.draw_line(node11_x, node11_y, node17_x, node17_y)
-        self.draw_line(node12_x, node12_y, node19_x, node19_y)
-        self.draw_line(node13_x, node13_y, node14_x, node14_y)
-        self.draw_line(node13_x, node13_y, node21_x, node21_y)
-        self.draw_line(node14_x, node14_y, node15_x, node15_y)
-        self.draw_line(node15_x, node15_y, node16_x, node16_y)
-        self.draw_line(node15_x, node15_y, node22_x, node22_y)
-        self.draw_line(node16_x, node16_y, node17_x, node17_y)
-        self.draw_line(node17_x, node17_y, node18_x, node18_y)
-        self.draw_line(node18_x, node18_y, node23_x, node23_y)
-        self.draw_line(node18_x, node18_y, node19_x, node19_y)
-        self.draw_line(node19_x, node19_y, node20_x, node20_y)
-        self.draw_line(node20_x, node20_y, node24_x, node24_y)
-        self.draw_line(node21_x, node21_y, node22_x, node22_y)
-        self.draw_line(node22_x, node22_y, node23_x, node23_y)
-        self.draw_line(node23_x, node23_y, node24_x, node24_y)
-        self.draw_line(node17_x, node17_y, node11_x, node11_y)
-        self.draw_line(node19_x, node19_y, node12_x, node12_y)
-        self.draw_line(node13_x, node13_y, node14_x, node14_y)
-        self.draw_line(node13_x, node13_y, node53_x, node53_y)
-        self.draw_line(node14_x, node14_y, node52_x, node52_y)
-        self.draw_line(node15_x, node15_y, node52_x, node52_y)
-        self.draw_line(node15_x, node15_y, node63_x, node63_y)
-        self.draw_line(node16_x, node16_y, node63_x, node63_y)
-        self.draw_line(node15_x, node15_y, node56_x, node56_y)
-        self.draw_line(node16_x, node16_y, node17_x, node17_y)
-        self.draw_line(node17_x, node17_y, node18_x, node18_y)
-        self.draw_line(node18_x, node18_y, node66_x, node66_y)
-        self.draw_line(node18_x, node18_y, node65_x, node65_y)
-        self.draw_line(node19_x, node19_y, node20_x, node20_y)
-        self.draw_line(node19_x, node19_y, node65_x, node65_y)
-        self.draw_line(node20_x, node20_y, node69_x, node69_y)
-        self.draw_line(node74_x, node74_y, node24_x, node24_y)
-        self.draw_line(node75_x, node75_y, node73_x, node73_y)
-        self.draw_line(node74_x, node74_y, node69_x, node69_y)
-        self.draw_line(node73_x, node73_y, node74_x, node74_y)
-        self.draw_line(node68_x, node68_y, node69_x, node69_y)
-        self.draw_line(node68_x, node68_y, node73_x, node73_y)
-        self.draw_line(node75_x, node75_y, node24_x, node24_y)
-        self.draw_line(node75_x, node75_y, node23_x, node23_y)
-        self.draw_line(node65_x, node65_y, node68_x, node68_y)
-        self.draw_line(node67_x, node67_y, node68_x, node68_y)
-        self.draw_line(node70_x, node70_y, node68_x, node68_y)
-        self.draw_line(node70_x, node70_y, node67_x, node67_y)
-        self.draw_line(node70_x, node70_y, node73_x, node73_y)
-        self.draw_line(node70_x, node70_y, node72_x, node72_y)
-        self.draw_line(node72_x, node72_y, node73_x, node73_y)
-        self.draw_line(node72_x, node72_y, node67_x, node67_y)
-        self.draw_line(node66_x, node66_y, node67_x, node67_y)
-        self.draw_line(node66_x, node66_y, node71_x, node71_y)
-        self.draw_line(node71_x, node71_y, node72_x, node72_y)
-        self.draw_line(node71_x, node71_y, node23_x, node23_y)
-        self.draw_line(node23_x, node23_y, node22_x, node22_y)
-        self.draw_line(node63_x, node63_y, node64_x, node64_y)
-        self.draw_line(node56_x, node56_y, node61_x, node61_y)
-        self.draw_line(node22_x, node22_y, node61_x, node61_y)
-        self.draw_line(node22_x, node22_y, node62_x, node62_y)
-        self.draw_line(node60_x, node60_y, node61_x, node61_y)
-        self.draw_line(node60_x, node60_y, node62_x, node62_y)
-        self.draw_line(node21_x, node21_y, node62_x, node62_y)
-        self.draw_line(node21_x, node21_y, node58_x, node58_y)
-        self.draw_line(node59_x, node59_y, node58_x, node58_y)
-        self.draw_line(node53_x, node53_y, node58_x, node58_y)
-        self.draw_line(node53_x, node53_y, node54_x, node54_y)
-        self.draw_line(node55_x, node55_y, node56_x, node56_y)
-        self.draw_line(node55_x, node55_y, node52_x, node52_y)
-        self.draw_line(node57_x, node57_y, node54_x, node54_y)
-        self.draw_line(node57_x, node57_y, node55_x, node55_y)
-        self.draw_line(node57_x, node57_y, node59_x, node59_y)
-        self.draw_line(node57_x, node57_y, node60_x, node60_y)
-        self.draw_line(node55_x, node55_y, node54_x, node54_y)
-        self.draw_line(node59_x, node59_y, node60_x, node60_y)
-        self.draw_line(node14_x, node14_y, node9_x, node9_y)
-        self.draw_line(node16_x, node16_y, node10_x, node10_y)
-        self.draw_line(node17_x, node17_y, node11_x, node11_y)
-        self.draw_line(node19_x, node19_y, node12_x, node12_y)
-        self.draw_line(node76_x, node76_y, node38_x, node38_y)
-        self.draw_line(node1_x, node1_y, node25_x, node25_y)
-        self.draw_line(node1_x, node1_y, node28_x, node28_y)
-        self.draw_line(node2_x, node2_y, node28_x, node28_y)
-        self.draw_line(node2_x, node2_y, node37_x, node37_y)
-        self.draw_line(node2_x, node2_y, node3_x, node3_y)
-        self.draw_line(node3_x, node3_y, node41_x, node41_y)
-        self.draw_line(node3_x, node3_y, node48_x, node48_y)
-        self.draw_line(node4_x, node4_y, node48_x, node48_y)
-        self.draw_line(node4_x, node4_y, node8_x, node8_y)
-        self.draw_line(node25_x, node25_y, node30_x, node30_y)
-        self.draw_line(node25_x, node25_y, node26_x, node26_y)
-        self.draw_line(node26_x, node26_y, node29_x, node29_y)
-        self.draw_line(node26_x, node26_y, node27_x, node27_y)
-        self.draw_line(node26_x, node26_y, node31_x, node31_y)
-        self.draw_line(node30_x, node30_y, node29_x, node29_y)
-        self.draw_line(node29_x, node29_y, node32_x, node32_y)
-        self.draw_line(node29_x, node29_y, node31_x, node31_y)
-        self.draw_line(node33_x, node33_y, node32_x, node32_y)
-        self.draw_line(node33_x, node33_y, node34_x, node34_y)
-        self.draw_line(node30_x, node30_y, node5_x, node5_y)
-        self.draw_line(node5_x, node5_y, node34_x, node34_y)
-        self.draw_line(node34_x, node34_y, node9_x, node9_y)
-        self.draw_line(node9_x, node9_y, node6_x, node6_y)
-        self.draw_line(node27_x, node27_y, node37_x, node37_y)
-        self.draw_line(node27_x, node27_y, node31_x, node31_y)
-        self.draw_line(node31_x, node31_y, node32_x, node32_y)
-        self.draw_line(node31_x, node31_y, node36_x, node36_y)
-        self.draw_line(node32_x, node32_y, node35_x, node35_y, )
-        self.draw_line(node37_x, node37_y, node38_x, node38_y)
-        self.draw_line(node38_x, node38_y, node36_x, node36_y)
-        self.draw_line(node36_x, node36_y, node35_x, node35_y)
-        self.draw_line(node35_x, node35_y, node6_x, node6_y)
-
-        self.draw_line(node6_x, node6_y, node10_x, node10_y)
-        self.draw_line(node10_x, node10_y, node40_x, node40_y)
-        self.draw_line(node38_x, node38_y, node76_x, node76_y)
-        self.draw_line(node76_x, node76_y, node39_x, node39_y)
-        self.draw_line(node39_x, node39_y, node40_x, node40_y)
-        self.draw_line(node39_x, node39_y, node43_x, node43_y)
-        self.draw_line(node40_x, node40_y, node11_x, node11_y)
-        self.draw_line(node11_x, node11_y, node7_x, node7_y)
-
-        self.draw_line(node41_x, node41_y, node45_x, node45_y)
-        self.draw_line(node41_x, node41_y, node42_x, node42_y)
-        self.draw_line(node42_x, node42_y, node46_x, node46_y)
-        self.draw_line(node42_x, node42_y, node43_x, node43_y)
-        self.draw_line(node43_x, node43_y, node44_x, node44_y)
-        self.draw_line(node44_x, node44_y, node7_x, node7_y)
-        self.draw_line(node44_x, node44_y, node47_x, node47_y)
-        self.draw_line(node45_x, node45_y, node49_x, node49_y)
-        self.draw_line(node46_x, node46_y, node49_x, node49_y)
-        self.draw_line(node46_x, node46_y, node50_x, node50_y)
-        self.draw_line(node47_x, node47_y, node50_x, node50_y)
-        self.draw_line(node48_x, node48_y, node49_x, node49_y)
-        self.draw_line(node49_x, node49_y, node50_x, node50_y)
-        self.draw_line(node47_x, node47_y, node50_x, node50_y)
-        self.draw_line(node50_x, node50_y, node51_x, node51_y)
-        self.draw_line(node7_x, node7_y, node51_x, node51_y)
-        self.draw_line(node51_x, node51_y, node12_x, node12_y)
-        self.draw_line(node12_x, node12_y, node8_x, node8_y)
-
-        self.draw_line(node48_x, node48_y, node4_x, node4_y)
-        self.draw_line(node4_x, node4_y, node8_x, node8_y)
-
-        self.draw_line(node77_x, node77_y, node5_x, node5_y)
-        self.draw_line(node78_x, node78_y, node77_x, node77_y)
-        self.draw_line(node79_x, node79_y, node78_x, node78_y)
-        self.draw_line(node80_x, node80_y, node79_x, node79_y)
-        self.draw_line(node81_x, node81_y, node79_x, node79_y)
-        self.draw_line(node82_x, node82_y, node81_x, node81_y)
-        self.draw_line(node83_x, node83_y, node81_x, node81_y)
-        self.draw_line(node84_x, node84_y, node85_x, node85_y)
-        self.draw_line(node85_x, node85_y, node80_x, node80_y)
-        self.draw_line(node86_x, node86_y, node85_x, node85_y)
-        self.draw_line(node87_x, node87_y, node78_x, node78_y)
-        self.draw_line(node87_x, node87_y, node88_x, node88_y)
-        self.draw_line(node89_x, node89_y, node88_x, node88_y)
-        self.draw_line(node89_x, node89_y, node91_x, node91_y)
-        self.draw_line(node90_x, node90_y, node89_x, node89_y)
-        self.draw_line(node91_x, node91_y, node90_x, node90_y)
-        self.draw_line(node91_x, node91_y, node98_x, node98_y)
-        self.draw_line(node92_x, node92_y, node91_x, node91_y)
-        self.draw_line(node93_x, node93_y, node90_x, node90_y)
-        self.draw_line(node93_x, node93_y, node87_x, node87_y)
-        self.draw_line(node94_x, node94_y, node93_x, node93_y)
-        self.draw_line(node94_x, node94_y, node92_x, node92_y)
-        self.draw_line(node94_x, node94_y, node86_x, node86_y)
-        self.draw_line(node95_x, node95_y, node89_x, node89_y)
-        self.draw_line(node95_x, node95_y, node13_x, node13_y)
-        self.draw_line(node95_x, node95_y, node53_x, node53_y)
-        self.draw_line(node96_x, node96_y, node58_x, node58_y)
-        self.draw_line(node96_x, node96_y, node91_x, node91_y)
-        self.draw_line(node96_x, node96_y, node21_x, node21_y)
-        self.draw_line(node97_x, node97_y, node86_x, node86_y)
-        self.draw_line(node98_x, node98_y, node97_x, node97_y)
-        self.draw_line(node98_x, node98_y, node21_x, node21_y)
-        self.draw_line(node99_x, node99_y, node97_x, node97_y)
-        self.draw_line(node100_x, node100_y, node99_x, node99_y)
-        self.draw_line(node100_x, node100_y, node98_x, node98_y)
-        self.draw_line(node100_x, node100_y, node101_x, node101_y)
-        self.draw_line(node101_x, node101_y, node99_x, node99_y)
-        self.draw_line(node102_x, node102_y, node101_x, node101_y)
-        self.draw_line(node102_x, node102_y, node86_x, node86_y)
-        self.draw_line(node100_x, node100_y, node99_x, node99_y)
-        self.draw_line(node103_x, node103_y, node104_x, node104_y)
-        self.draw_line(node105_x, node105_y, node104_x, node104_y)
-        self.draw_line(node106_x, node106_y, node105_x, node105_y)
-        self.draw_line(node107_x, node107_y, node106_x, node106_y)
-        self.draw_line(node107_x, node107_y, node105_x, node105_y)
-
-        self.draw_line(node106_x, node106_y, node109_x, node109_y)
-        self.draw_line(node106_x, node106_y, node103_x, node103_y)
-        self.draw_line(node106_x, node106_y, node107_x, node107_y)
-        self.draw_line(node105_x, node105_y, node107_x, node107_y)
-        self.draw_line(node103_x, node103_y, node108_x, node108_y)
-        self.draw_line(node109_x, node109_y, node110_x, node110_y)
-        self.draw_line(node107_x, node107_y, node111_x, node111_y)
-        self.draw_line(node105_x, node105_y, node113_x, node113_y)
-        self.draw_line(node62_x, node62_y, node118_x, node118_y)
-        self.draw_line(node116_x, node116_y, node118_x, node118_y)
-        self.draw_line(node116_x, node116_y, node117_x, node117_y)
-        self.draw_line(node117_x, node117_y, node118_x, node118_y)
-        self.draw_line(node121_x, node121_y, node120_x, node120_y)
-        self.draw_line(node122_x, node122_y, node125_x, node125_y)
-        self.draw_line(node123_x, node123_y, node126_x, node126_y)
-        self.draw_line(node125_x, node125_y, node126_x, node126_y)
-        self.draw_line(node125_x, node125_y, node127_x, node127_y)
-        self.draw_line(node126_x, node126_y, node127_x, node127_y)
-        self.draw_line(node21_x, node21_y, node115_x, node115_y)
-        self.draw_line(node22_x, node22_y, node119_x, node119_y)
-        self.draw_line(node23_x, node23_y, node124_x, node124_y)
-        self.draw_line(node24_x, node24_y, node128_x, node128_y)
-        self.draw_line(node114_x, node114_y, node86_x, node86_y)
-        self.draw_line(node114_x, node114_y, node115_x, node115_y)
-        self.draw_line(node115_x, node115_y, node119_x, node119_y)
-        self.draw_line(node124_x, node124_y, node128_x, node128_y)
-        self.draw_line(node129_x, node129_y, node130_x, node130_y)
-        self.draw_line(node1_x, node1_y, node130_x, node130_y)
-        self.draw_line(node1_x, node1_y, node135_x, node135_y)
-        self.draw_line(node1_x, node1_y, node134_x, node134_y)
-        self.draw_line(node130_x, node130_y, node77_x, node77_y)
-        self.draw_line(node131_x, node131_y, node132_x, node132_y)
-        self.draw_line(node131_x, node131_y, node134_x, node134_y)
-        self.draw_line(node133_x, node133_y, node134_x, node134_y)
-        self.draw_line(node133_x, node133_y, node135_x, node135_y)
-        self.draw_line(node2_x, node2_y, node132_x, node132_y)
-        self.draw_line(node2_x, node2_y, node28_x, node28_y)
-        self.draw_line(node28_x, node28_y, node135_x, node135_y)
-        self.draw_line(node87_x, node87_y, node136_x, node136_y)
-        self.draw_line(node13_x, node13_y, node136_x, node136_y)
-        self.draw_line(node53_x, node53_y, node58_x, node58_y)
-        self.draw_line(node84_x, node84_y, node108_x, node108_y)
-        self.draw_line(node83_x, node83_y, node108_x, node108_y)
-        self.draw_line(node83_x, node83_y, node109_x, node109_y)
-        self.draw_line(node111_x, node111_y, node110_x, node110_y)
-        self.draw_line(node111_x, node111_y, node112_x, node112_y)
-        self.draw_line(node113_x, node113_y, node112_x, node112_y)
-        self.draw_line(node113_x, node113_y, node114_x, node114_y)
-        self.draw_line(node119_x, node119_y, node124_x, node124_y)
-        self.draw_line(node121_x, node121_y, node22_x, node22_y)
-        self.draw_line(node121_x, node121_y, node23_x, node23_y)
-        self.draw_line(node127_x, node127_y, node75_x, node75_y)
+        # one source of truth: the routable matrix plus the outer nodes
+        self.draw_edges(campus_edges(self.floyd_matrix))
 
         self.path_points = [
-            (node1_x, node1_y),
-            (node2_x, node2_y),
-            (node3_x, node3_y),
-            (node4_x, node4_y),
-            (node1_x, node1_y)
+            self.node_positions[1],
+            self.node_positions[2],
+            self.node_positions[3],
+            self.node_positions[4],
+            self.node_positions[1]
         ]
 
 
         initial_positions = [
-            (node31_x, node31_y),  # student 1
-            (node27_x, node27_y),  # student 2
-            (node26_x, node26_y),  # student 3
-            (node29_x, node29_y),  # student 4
-            (node32_x, node32_y),  # student 5
-            (node75_x, node75_y),  # student 6
-            (node26_x, node26_y), # Professor 1
-            (node18_x, node18_y)  # Professor 2
+            self.node_positions[31],  # student 1
+            self.node_positions[27],  # student 2
+            self.node_positions[26],  # student 3
+            self.node_positions[29],  # student 4
+            self.node_positions[32],  # student 5
+            self.node_positions[75],  # student 6
+            self.node_positions[26],  # Professor 1
+            self.node_positions[18]  # Professor 2
         ]
 
         if hasattr(self, 'moving_points'):
-            for point in self.moving_points.values():
-                self.canvas.delete(point)
+            self.layers.clear("agents")
             self.moving_points = {}
 
         for i, pos in enumerate(initial_positions, 1):
@@ -1699,24 +1388,32 @@ class CampusGUI:
         self.time_text.insert(tk.END, time_str)
 
     def start_time_update(self):
-        """
-         if not self.simulation_running:
-            return
-
-        """
+        """Run the simulation clock; one tick loop however often this is called"""
         if not self.simulation_running:
 
             self.start_button.configure(state=tk.DISABLED)
             return
 
-        self.map_minutes += 1
-        if self.map_minutes == 60:
-            self.map_minutes = 0
-            self.map_hours += 1
+        self.clock.start()
+        self.animator.resume()
+        self.pause_button.configure(text="Pause")
+        if self._clock_after_id is None:
+            self._clock_tick()
+
+    def _clock_tick(self):
+        self._clock_after_id = None
+        self.apply_clock()
+        if self.simulation_running and self.clock.running:
+            self._clock_after_id = self.root.after(self.clock_tick_ms, self._clock_tick)
+
+    def apply_clock(self):
+        """Catch departures, day/night and the display up with the clock"""
+        minute = self.clock.now()
 
         # reach 24:00 or not
-        if self.map_hours >= 24:
+        if self.clock.finished:
             self.simulation_running = False
+            self.clock.pause()
             self.map_hours = 24
             self.map_minutes = 0
             self.update_time_display()
@@ -1730,13 +1427,48 @@ class CampusGUI:
 
             return
 
+        if self.sim_engine is not None:
+            # every departure due since the last tick fires now, however late the tick was
+            self.sim_engine.advance_to(minute)
+
+        hours, minutes = divmod(int(minute), 60)
+        if (hours, minutes) == (self.map_hours, self.map_minutes):
+            return
+        self.map_hours, self.map_minutes = hours, minutes
+
         if self.map_hours >= 19 and self.current_mode == "day":
             self.set_night_mode()
         elif self.map_hours < 19 and self.current_mode == "night":
             self.set_day_mode()
 
         self.update_time_display()
-        self.root.after(1000, self.start_time_update)
+
+class StartupProfile:
+    """Wall time per startup phase, printed with --profile-startup"""
+
+    def __init__(self, start: float, enabled: bool = True):
+        self.enabled = enabled
+        self.start = start
+        self.last = start
+        self.phases = []
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self, item_counts: Dict[str, int] = None):
+        if not self.enabled:
+            return
+        total = self.last - self.start
+        print("====== Startup profile ======")
+        for phase, seconds in self.phases:
+            print(f"{phase:<16}{seconds * 1000:>9.1f} ms")
+        print(f"{'total':<16}{total * 1000:>9.1f} ms")
+        print(f"pandas loaded: {'pandas' in sys.modules}, PIL loaded: {'PIL' in sys.modules}")
+        if item_counts:
+            print("canvas items: " + ", ".join(f"{tag} {count}" for tag, count in item_counts.items()))
+
 
 def create_gui() -> CampusGUI:
 
@@ -1746,22 +1478,28 @@ def create_gui() -> CampusGUI:
 
 if __name__ == "__main__":
 
-    import pandas as pd
-    import numpy as np
+    profile = StartupProfile(_startup_t0, enabled="--profile-startup" in sys.argv)
+    profile.mark("imports")
 
     file_path = "matrix_update.xlsx"
 
     try:
-        df = pd.read_excel(file_path, header=None)
-        distance_data = df.iloc[1:, 1:].values
-
-        # change 0 to INF
-        floyd_matrix = np.where(distance_data == 0, float('inf'), distance_data)
-        np.fill_diagonal(floyd_matrix, 0)
+        # warm start reads matrix_update.cache.npz, no spreadsheet parse and no Floyd
+        floyd_matrix, dist_matrix, path_matrix = load_matrix(file_path)
+        profile.mark("matrix load")
 
         gui = create_gui()
+        profile.mark("create_gui")
+        # the drawn edges come from the matrix, so it is set first
+        gui.router.set_matrix(floyd_matrix, solved=(dist_matrix, path_matrix))
         gui.create_route()
-        gui.floyd_matrix = floyd_matrix
+        profile.mark("create_route")
+
+        if "--students" in sys.argv:
+            # python GUI.py --students 300 [--seed 1]: synthetic load instead of the 7 agents
+            count = int(sys.argv[sys.argv.index("--students") + 1])
+            seed = int(sys.argv[sys.argv.index("--seed") + 1]) if "--seed" in sys.argv else 0
+            gui.set_schedules(generate_schedules(count, seed=seed, node_count=len(floyd_matrix)))
 
         reset_button = ttk.Button(
             gui.control_frame,
@@ -1769,83 +1507,8 @@ if __name__ == "__main__":
             command=gui.reset_simulation
         )
         reset_button.pack(padx=5, pady=5)
-        # D5
-        gui.add_building(330, 250, "canteen", "D5b")
-        gui.add_building(370, 245, "dormitory", "D5c")
-        gui.add_building(330, 220, "dormitory", "D5d")
-        gui.add_building(370, 215, "dormitory", "D5e")
-        gui.add_building(330, 190, "dormitory", "D5f")
-        gui.add_building(370, 180, "dormitory", "D5g")
-
-        # F5
-        gui.add_building(530, 245, "dormitory", "F5a")
-        gui.add_building(530, 215, "dormitory", "F5c")
-        gui.add_building(570, 240, "canteen", "F5b")
-        gui.add_building(570, 210, "dormitory", "F5d")
-        gui.add_building(530, 185, "dormitory", "F5e")
-
-        # F3
-        gui.add_building(570, 380, "teaching", "F3d")
-        gui.add_building(530, 380, "teaching", "F3c")
-        gui.add_building(530, 420, "teaching", "F3a")
-        gui.add_building(570, 420, "teaching", "F3b")
-
-        # D3
-        gui.add_building(330, 380, "teaching", "D3c")
-        gui.add_building(370, 380, "teaching", "D3d")
-        gui.add_building(330, 420, "teaching", "D3a")
-        gui.add_building(370, 420, "teaching", "D3b")
-
-        # D1(new)
-        gui.add_building(330, 500, "academy", "D1c")
-        gui.add_building(370, 520, "academy", "D1b")
-        gui.add_building(330, 540, "academy", "D1a")
-
-        # F1(new)
-        gui.add_building(530, 500, "service center", "F1c")
-        gui.add_building(530, 540, "service center", "F1b")
-        gui.add_building(570, 520, "service center", "F1a")
-
-        # C1(new)
-        gui.add_building(235, 500, "academy", "C1c")
-        gui.add_building(280, 520, "academy", "C1b")
-        gui.add_building(235, 540, "academy", "C1a")
-
-        # B1(new)
-        gui.add_building(100, 510, "academy", "B1d")
-        gui.add_building(175, 520, "academy", "B1c")
-        gui.add_building(100, 540, "academy", "B1a")
-        gui.add_building(135, 540, "academy", "B1b")
-        gui.add_building(125, 475, "canteen", "B1e")
-
-        # B2(new)
-        gui.add_building(158, 390, "playground", "B2")
-
-        # E1(new)
-        gui.add_building(425, 500, "square", "E1")
-
-        # C3&2(new)
-        gui.add_building(235, 375, "service center", "C3c")
-        gui.add_building(280, 375, "service center", "C3b")
-        gui.add_building(235, 415, "service center", "C3a")
-        gui.add_building(235, 445, "academy", "C2a")
-        gui.add_building(280, 430, "academy", "C2b")
-
-        # E3
-        gui.add_building(430, 380, "library", "E3")
-
-        # D6
-        gui.add_building(320, 77, "playground & gym", "D6")  # 4新增
-
-        # A2b
-        gui.add_building(210, 185, "hospital", "A2b")  # 8新增
-
-        # A3
-        gui.add_building(65, 370, "basketball ground", "A3")  # 8新增
-
-        # E5
-        gui.add_building(435, 180, "innovative2", "Noodles")
-        gui.add_building(465, 210, "innovative2", "McDonald")
+        gui.add_buildings(BUILDINGS)
+        profile.mark("add_building")
 
 
         start_movement_button = ttk.Button(
@@ -1854,6 +1517,14 @@ if __name__ == "__main__":
             command=gui.move_all_students
         )
         start_movement_button.pack(padx=5, pady=5)
+
+        if profile.enabled:
+            # idle callbacks run in order, so this fires after the first redraw
+            def first_frame():
+                profile.mark("first frame")
+                profile.report(gui.canvas_item_counts())
+            gui.root.after_idle(first_frame)
+
         gui.root.mainloop()
 
     except Exception as e:
@@ -0,0 +1,281 @@
+"""
+Compact, array-backed state of every simulated agent.
+
+One row per agent in a set of NumPy columns instead of per-agent dicts, so
+the per-frame update of thousands of walkers is a handful of vectorized
+operations. Routes are stored as one flat polyline buffer plus per-agent
+offsets.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# the original 7 agents, ids match DEFAULT_SCHEDULES in simulation.py
+DEFAULT_AGENT_INFO: Dict[int, Dict[str, str]] = {
+    1: {"major": "Intelligent Manufacturing", "color": "red", "type": "point"},
+    2: {"major": "Future Technology", "color": "green", "type": "point"},
+    3: {"major": "Microelectronics", "color": "blue", "type": "point"},
+    4: {"major": "Biomedical Engineering", "color": "purple", "type": "point"},
+    5: {"major": "Integrated Circuits", "color": "orange", "type": "point"},
+    6: {"major": "Professor A", "color": "yellow", "type": "square"},
+    7: {"major": "Professor B", "color": "brown", "type": "square"},
+}
+
+# what each default agent is doing on every leg, for the schedule window
+DEFAULT_AGENT_ACTIVITIES: Dict[int, List[str]] = {
+    1: [
+        "08:40 Depart from dormitory D5e to classroom F3b for class",
+        "12:00 After class, go to cafeteria F5b for lunch",
+        "12:40 Return to dormitory D5e to rest after lunch",
+        "13:25 Depart from dormitory to classroom F3a for class",
+        "17:05 After class, go to cafeteria D5b for dinner",
+        "17:35 After dinner, go to library E3 for self-study",
+        "21:30 Return to dormitory D5e from library to rest"
+    ],
+    2: [
+        "08:30 Depart from dormitory D5f to classroom F3a for class",
+        "12:10 After class, go to convenience store D5c for lunch",
+        "12:50 Return to dormitory D5f to rest after lunch",
+        "13:35 Depart from dormitory to library E3 for self-study",
+        "17:15 After self-study, go to cafeteria F5b for dinner",
+        "17:45 After dinner, return to library E3 for self-study",
+        "21:40 Return to dormitory D5f from library to rest"
+    ],
+    3: [
+        "08:50 Depart from dormitory D5g to classroom F3c for class",
+        "12:20 After class, go to cafeteria F5b for lunch",
+        "13:00 Return to dormitory D5g to rest after lunch",
+        "13:45 Depart from dormitory to laboratory D3d for experiment",
+        "17:25 After experiment, go to cafeteria D5b for dinner",
+        "18:00 After dinner, go to library E3 for self-study",
+        "21:55 Return to dormitory D5g from library to rest"
+    ],
+    4: [
+        "09:00 Depart from dormitory D5f to classroom F3c for class",
+        "13:00 After class, go to cafeteria D5b for lunch",
+        "13:30 Return to dormitory D5f to rest after lunch",
+        "14:15 Depart from dormitory to library E3 for self-study",
+        "17:45 After self-study, go to cafeteria B1e for dinner",
+        "18:20 After dinner, return to library E3 for self-study",
+        "22:20 Return to dormitory D5f from library to rest"
+    ],
+    5: [
+        "09:10 Depart from dormitory D5e to classroom D3a for class",
+        "13:10 After class, go to Xiao Mian restaurant for lunch",
+        "13:40 Return to dormitory D5e to rest after lunch",
+        "14:25 Depart from dormitory to classroom F3b for class",
+        "18:05 After class, go to McDonald's for dinner",
+        "18:35 After dinner, go to library E3 for self-study",
+        "22:20 Return to dormitory D5e from library to rest"
+    ],
+    6: [
+        "10:30 Depart from dormitory D5f to classroom F3c for class",
+        "12:10 After class, go to cafeteria B1e for lunch",
+        "12:55 Return to dormitory D5f to rest after lunch",
+        "13:40 Depart from dormitory to gymnasium D6 East",
+        "16:00 Return to dormitory D5f after PE class",
+        "17:00 Depart again to cafeteria B1e for dinner",
+        "17:45 Return to dormitory D5f after dinner"
+    ],
+    7: [
+        "09:30 Depart from dormitory D5f to classroom F3b as teaching assistant",
+        "10:20 Return to dormitory D5f to review latest research papers",
+        "12:00 Depart from dormitory to cafeteria B1e for lunch",
+        "12:40 Return to dormitory D5f to rest after lunch",
+        "17:20 Depart from dormitory to cafeteria B1e for dinner",
+        "17:50 After dinner, proceed to gymnasium D6 for exercise",
+        "19:25 Return to dormitory D5f for deep learning experiments"
+    ]
+}
+
+
+def parse_time(time_str: str) -> int:
+    """'08:10' -> minutes since midnight"""
+    hours, minutes = map(int, time_str.split(':'))
+    return hours * 60 + minutes
+
+
+def format_time(minute: float) -> str:
+    minute = int(minute)
+    return f"{minute // 60:02}:{minute % 60:02}"
+
+
+class AgentStore:
+    """
+    Columns (row = agent id - 1 for agents built from schedules):
+        x, y: current position on the canvas
+        node: last node reached (0-based), -1 if unknown
+        edge: index of the edge being walked in the agent's route, -1 if idle
+        progress: seconds walked along that edge
+        next_departure: simulated minute of the next leg, inf when done
+        schedule_index: next leg in the agent's schedule
+        route_offset, route_length: slice of the flat route buffers
+
+    Flat route buffers: route_x, route_y per point, route_seconds per edge
+    (stored at its first point). An edge timed inf is not timed yet, the
+    agent waits at its start until time_edge() sets it.
+    """
+
+    __slots__ = ("count", "x", "y", "node", "edge", "progress",
+                 "next_departure", "schedule_index", "route_offset", "route_length",
+                 "route_x", "route_y", "route_seconds", "route_used")
+
+    def __init__(self, capacity: int = 16):
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.node = np.full(capacity, -1, dtype=np.int32)
+        self.edge = np.full(capacity, -1, dtype=np.int32)
+        self.progress = np.zeros(capacity)
+        self.next_departure = np.full(capacity, np.inf)
+        self.schedule_index = np.zeros(capacity, dtype=np.int32)
+        self.route_offset = np.zeros(capacity, dtype=np.int32)
+        self.route_length = np.zeros(capacity, dtype=np.int32)
+        self.route_x = np.zeros(capacity * 8)
+        self.route_y = np.zeros(capacity * 8)
+        self.route_seconds = np.zeros(capacity * 8)
+        self.route_used = 0
+
+    @classmethod
+    def from_schedules(cls, schedules: Dict[int, List[Tuple[str, int, int]]],
+                       node_positions: Dict[int, tuple] = None) -> "AgentStore":
+        """One row per agent id (ids 1..N), parked at the start of its first leg"""
+        node_positions = node_positions or {}
+        count = max(schedules) if schedules else 0
+        store = cls(max(16, count))
+        for _ in range(count):
+            store.add()
+        for agent, schedule in schedules.items():
+            if not schedule:
+                continue
+            row = agent - 1
+            time_str, start_node, _ = schedule[0]
+            store.node[row] = start_node - 1
+            store.next_departure[row] = parse_time(time_str)
+            if start_node in node_positions:
+                store.x[row], store.y[row] = node_positions[start_node]
+        return store
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, capacity: int):
+        for name in ("x", "y", "node", "edge", "progress",
+                     "next_departure", "schedule_index", "route_offset", "route_length"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def add(self, x: float = 0.0, y: float = 0.0) -> int:
+        """Append an idle agent, returns its row"""
+        if self.count == len(self.x):
+            self._grow(len(self.x) * 2)
+        row = self.count
+        self.count += 1
+        self.x[row], self.y[row] = x, y
+        self.node[row] = -1
+        self.edge[row] = -1
+        self.progress[row] = 0.0
+        self.next_departure[row] = np.inf
+        self.schedule_index[row] = 0
+        self.route_offset[row] = 0
+        self.route_length[row] = 0
+        return row
+
+    def _compact_routes(self, extra: int):
+        """Drop polylines of finished routes, growing the buffer if still too small"""
+        live = np.flatnonzero(self.edge[:self.count] >= 0)
+        used = int(self.route_length[live].sum())
+        size = len(self.route_x)
+        while used + extra > size // 2:
+            size *= 2
+        route_x, route_y, route_seconds = np.empty(size), np.empty(size), np.empty(size)
+        offset = 0
+        for row in live:
+            start, length = self.route_offset[row], self.route_length[row]
+            route_x[offset:offset + length] = self.route_x[start:start + length]
+            route_y[offset:offset + length] = self.route_y[start:start + length]
+            route_seconds[offset:offset + length] = self.route_seconds[start:start + length]
+            self.route_offset[row] = offset
+            offset += length
+        self.route_x, self.route_y, self.route_seconds = route_x, route_y, route_seconds
+        self.route_used = offset
+
+    def set_route(self, row: int, points, edge_seconds, elapsed: float = 0.0):
+        """
+        Start walking row along points (list of (x, y)).
+
+        Args:
+            edge_seconds: walking time of every edge, or one per edge; inf
+                leaves edges untimed for time_edge()
+            elapsed: seconds already walked, e.g. a departure processed late;
+                the next advance() puts the agent where it should be by now
+        """
+        length = len(points)
+        if self.route_used + length > len(self.route_x):
+            self.edge[row] = -1
+            self._compact_routes(length)
+        start = self.route_used
+        coords = np.asarray(points, dtype=np.float64).reshape(length, 2)
+        self.route_x[start:start + length] = coords[:, 0]
+        self.route_y[start:start + length] = coords[:, 1]
+        self.route_seconds[start:start + length - 1] = edge_seconds
+        self.route_seconds[start + length - 1] = np.inf
+        self.route_used += length
+
+        self.route_offset[row] = start
+        self.route_length[row] = length
+        self.progress[row] = elapsed
+        self.x[row], self.y[row] = coords[0]
+        self.edge[row] = 0 if length > 1 else -1
+
+    def time_edge(self, row: int, edge: int, seconds: float):
+        """Set the walking time of edge `edge` of row's route, ignored if it has no such edge"""
+        if 0 <= edge < self.route_length[row] - 1:
+            self.route_seconds[self.route_offset[row] + edge] = seconds
+
+    def stop(self, row: int):
+        self.edge[row] = -1
+
+    def moving(self) -> np.ndarray:
+        return np.flatnonzero(self.edge[:self.count] >= 0)
+
+    def advance(self, seconds: float):
+        """
+        Move every walking agent forward by seconds of wall time.
+
+        Returns:
+            moved: rows whose position changed (including finished ones)
+            finished: rows that reached the end of their route this step
+        """
+        rows = self.moving()
+        if rows.size == 0:
+            return rows, rows
+
+        offset = self.route_offset[rows]
+        last_edge = self.route_length[rows] - 1
+        edge = self.edge[rows].copy()
+        walked = self.progress[rows] + seconds
+        done = np.zeros(rows.size, dtype=bool)
+        # edges take different times, a long step may cross several of them
+        while True:
+            duration = self.route_seconds[offset + edge]
+            cross = ~done & (walked >= duration)
+            if not cross.any():
+                break
+            walked[cross] -= duration[cross]
+            edge[cross] += 1
+            done |= cross & (edge >= last_edge)
+
+        edge = np.where(done, last_edge - 1, edge)
+        # an untimed (inf) edge keeps the agent at its start
+        fraction = np.ones(rows.size)
+        np.divide(walked, self.route_seconds[offset + edge], out=fraction, where=~done)
+
+        a = offset + edge
+        self.x[rows] = self.route_x[a] + (self.route_x[a + 1] - self.route_x[a]) * fraction
+        self.y[rows] = self.route_y[a] + (self.route_y[a + 1] - self.route_y[a]) * fraction
+        self.progress[rows] = walked
+        self.edge[rows] = np.where(done, -1, edge)
+        return rows, rows[done]
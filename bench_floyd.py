@@ -0,0 +1,91 @@
+"""
+Benchmark: pure-Python floyd_warshall vs the NumPy engine.
+
+    python bench_floyd.py
+    python bench_floyd.py --sizes 500 1000 2000 5000 --reference-max 300
+
+The pure-Python version is O(V^3) interpreted steps, so it is only run on
+graphs up to --reference-max nodes; above that only the NumPy engine is timed.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from matrix_cache import read_matrix_xlsx
+from routing import floyd_warshall, floyd_warshall_numpy, get_path
+
+
+def load_shipped_matrix(file_path="matrix_update.xlsx"):
+    return read_matrix_xlsx(file_path)
+
+
+def synthetic_graph(n, degree=4, seed=0):
+    """Sparse random campus-like graph: a ring for connectivity plus random short edges"""
+    rng = np.random.default_rng(seed)
+    matrix = np.full((n, n), float('inf'))
+    np.fill_diagonal(matrix, 0)
+
+    ring = np.arange(n)
+    weights = rng.integers(1, 20, size=n)
+    matrix[ring, (ring + 1) % n] = weights
+    matrix[(ring + 1) % n, ring] = weights
+
+    src = rng.integers(0, n, size=n * degree // 2)
+    dst = (src + rng.integers(2, max(3, n // 10), size=src.size)) % n
+    weights = rng.integers(1, 20, size=src.size)
+    keep = src != dst
+    matrix[src[keep], dst[keep]] = weights[keep]
+    matrix[dst[keep], src[keep]] = weights[keep]
+    return matrix
+
+
+def same_result(matrix, reference, engine):
+    ref_dist, ref_path = reference
+    dist, next_hop = engine
+    if not np.array_equal(np.asarray(ref_dist), dist):
+        return False
+    if not np.array_equal(np.asarray(ref_path), next_hop):
+        return False
+    n = len(matrix)
+    for start in range(0, n, max(1, n // 20)):
+        for end in range(n):
+            if get_path(ref_path, start, end) != get_path(next_hop, start, end):
+                return False
+    return True
+
+
+def run_case(name, matrix, reference_max):
+    n = len(matrix)
+
+    t0 = time.perf_counter()
+    engine = floyd_warshall_numpy(matrix)
+    numpy_time = time.perf_counter() - t0
+
+    if n <= reference_max:
+        t0 = time.perf_counter()
+        reference = floyd_warshall(matrix)
+        python_time = time.perf_counter() - t0
+        match = "yes" if same_result(matrix, reference, engine) else "NO"
+        print(f"{name:<16}{n:>7}{python_time:>12.3f}{numpy_time:>12.3f}"
+              f"{python_time / numpy_time:>10.1f}x{match:>8}")
+    else:
+        print(f"{name:<16}{n:>7}{'-':>12}{numpy_time:>12.3f}{'-':>11}{'-':>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 250, 500, 1000, 2000, 5000])
+    parser.add_argument("--reference-max", type=int, default=250,
+                        help="largest graph the pure-Python version is run on")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'graph':<16}{'nodes':>7}{'python s':>12}{'numpy s':>12}{'speedup':>11}{'same':>8}")
+    run_case("matrix_update", load_shipped_matrix(), args.reference_max)
+    for n in args.sizes:
+        run_case("synthetic", synthetic_graph(n, seed=args.seed), args.reference_max)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Static campus data: node coordinates and buildings.
+
+Node ids are 1-based, the same numbers as in matrix_update.xlsx and the
+schedules.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# node id -> canvas (x, y)
+NODE_POSITIONS: Dict[int, Tuple[int, int]] = {
+    1: (315, 175),  # node1
+    2: (415, 175),  # node2
+    3: (515, 175),  # node3
+    4: (615, 175),  # node4
+    5: (315, 285),  # node5
+    6: (415, 285),  # node6
+    7: (515, 285),  # node7
+    8: (615, 285),  # node8
+    9: (355, 285),  # node9
+    10: (445, 285),  # node10
+    11: (485, 285),  # node11
+    12: (575, 285),  # node12
+    13: (315, 365),  # node13
+    14: (355, 365),  # node14
+    15: (415, 365),  # node15
+    16: (445, 365),  # node16
+    17: (485, 365),  # node17
+    18: (515, 365),  # node18
+    19: (575, 365),  # node19
+    20: (615, 365),  # node20
+    21: (315, 470),  # node21
+    22: (415, 470),  # node22
+    23: (515, 470),  # node23
+    24: (615, 470),  # node24
+    25: (315, 190),  # node25
+    26: (330, 190),  # node26
+    27: (370, 180),  # node27
+    28: (370, 175),  # node28
+    29: (330, 220),  # node29
+    30: (315, 220),  # node30
+    31: (370, 215),  # node31
+    32: (370, 245),  # node32
+    33: (330, 250),  # node33
+    34: (330, 285),  # node34
+    35: (415, 245),  # node35
+    36: (415, 215),  # node36
+    37: (415, 180),  # node37
+    38: (415, 180),  # node38
+    39: (465, 210),  # node39
+    40: (465, 285),  # node40
+    41: (515, 185),  # node41
+    42: (515, 215),  # node42
+    43: (515, 210),  # node43
+    44: (515, 245),  # node44
+    45: (530, 185),  # node45
+    46: (530, 215),  # node46
+    47: (530, 245),  # node47
+    48: (570, 175),  # node48
+    49: (570, 210),  # node49
+    50: (570, 240),  # node50
+    51: (570, 285),  # node51
+    52: (370, 365),  # node52
+    53: (315, 380),  # node53
+    54: (330, 380),  # node54
+    55: (370, 380),  # node55
+    56: (415, 380),  # node56
+    57: (350, 400),  # node57
+    58: (315, 420),  # node58
+    59: (330, 420),  # node59
+    60: (370, 420),  # node60
+    61: (415, 420),  # node61
+    62: (370, 470),  # node62
+    63: (430, 365),  # node63
+    64: (430, 380),  # node64
+    65: (570, 365),  # node65
+    66: (515, 380),  # node66
+    67: (530, 380),  # node67
+    68: (570, 380),  # node68
+    69: (615, 380),  # node69
+    70: (550, 400),  # node70
+    71: (515, 420),  # node71
+    72: (530, 420),  # node72
+    73: (570, 420),  # node73
+    74: (615, 420),  # node74
+    75: (570, 470),  # node75
+    76: (435, 180),  # node76
+    77: (220, 285),  # node77
+    78: (158, 365),  # node78
+    79: (147, 390),  # node79
+    80: (158, 390),  # node80
+    81: (142, 410),  # node81
+    82: (65, 370),  # node82
+    83: (125, 457),  # node83
+    84: (148, 470),  # node84
+    85: (158, 470),  # node85
+    86: (220, 470),  # node86
+    87: (220, 365),  # node87
+    88: (235, 375),  # node88
+    89: (280, 375),  # node89
+    90: (235, 415),  # node90
+    91: (280, 430),  # node91
+    92: (235, 445),  # node92
+    93: (220, 415),  # node93
+    94: (220, 445),  # node94
+    95: (315, 375),  # node95
+    96: (315, 430),  # node96
+    97: (235, 470),  # node97
+    98: (280, 470),  # node98
+    99: (235, 500),  # node99
+    100: (280, 520),  # node100
+    101: (235, 540),  # node101
+    102: (220, 540),  # node102
+    103: (125, 475),  # node103
+    104: (175, 520),  # node104
+    105: (135, 540),  # node105
+    106: (100, 510),  # node106
+    107: (100, 540),  # node107
+    108: (136, 463),  # node108
+    109: (95, 500),  # node109
+    110: (90, 510),  # node110
+    111: (90, 540),  # node111
+    112: (90, 600),  # node112
+    113: (135, 600),  # node113
+    114: (220, 600),  # node114
+    115: (315, 600),  # node115
+    116: (330, 500),  # node116
+    117: (330, 540),  # node117
+    118: (370, 520),  # node118
+    119: (415, 600),  # node119
+    120: (425, 500),  # node120
+    121: (425, 470),  # node121
+    122: (515, 500),  # node122
+    123: (515, 540),  # node123
+    124: (515, 600),  # node124
+    125: (530, 500),  # node125
+    126: (530, 540),  # node126
+    127: (570, 520),  # node127
+    128: (615, 600),  # node128
+    129: (210, 185),  # node129
+    130: (252, 250),  # node130
+    131: (315, 70),  # node131
+    132: (415, 70),  # node132
+    133: (320, 77),  # node133
+    134: (315, 77),  # node134
+    135: (320, 175),  # node135
+    136: (235, 365)  # node136
+}
+
+# Edges of the nodes that matrix_update.xlsx does not cover yet (any edge
+# with an end beyond the matrix). Everything inside the matrix is drawn from
+# its nonzero entries, see campus_edges().
+OUTER_EDGES: List[Tuple[int, int]] = [
+    (5, 77), (77, 78), (78, 79), (79, 80), (79, 81), (81, 82), (81, 83), (84, 85), (80, 85),
+    (85, 86), (78, 87), (87, 88), (88, 89), (89, 91), (89, 90), (90, 91), (91, 98), (91, 92),
+    (90, 93), (87, 93), (93, 94), (92, 94), (86, 94), (89, 95), (13, 95), (53, 95), (58, 96),
+    (91, 96), (21, 96), (86, 97), (97, 98), (21, 98), (97, 99), (99, 100), (98, 100), (100, 101),
+    (99, 101), (101, 102), (86, 102), (103, 104), (104, 105), (105, 106), (106, 107), (105, 107),
+    (106, 109), (103, 106), (103, 108), (109, 110), (107, 111), (105, 113), (62, 118), (116, 118),
+    (116, 117), (117, 118), (120, 121), (122, 125), (123, 126), (125, 126), (125, 127), (126, 127),
+    (21, 115), (22, 119), (23, 124), (24, 128), (86, 114), (114, 115), (115, 119), (124, 128),
+    (129, 130), (1, 130), (1, 135), (1, 134), (77, 130), (131, 132), (131, 134), (133, 134),
+    (133, 135), (2, 132), (28, 135), (87, 136), (13, 136), (84, 108), (83, 108), (83, 109),
+    (110, 111), (111, 112), (112, 113), (113, 114), (119, 124), (22, 121), (23, 121), (75, 127),
+]
+
+# (x, y, building type, name), every building sits on a node
+BUILDINGS: List[Tuple[int, int, str, str]] = [
+    # D5
+    (330, 250, "canteen", "D5b"),
+    (370, 245, "dormitory", "D5c"),
+    (330, 220, "dormitory", "D5d"),
+    (370, 215, "dormitory", "D5e"),
+    (330, 190, "dormitory", "D5f"),
+    (370, 180, "dormitory", "D5g"),
+
+    # F5
+    (530, 245, "dormitory", "F5a"),
+    (530, 215, "dormitory", "F5c"),
+    (570, 240, "canteen", "F5b"),
+    (570, 210, "dormitory", "F5d"),
+    (530, 185, "dormitory", "F5e"),
+
+    # F3
+    (570, 380, "teaching", "F3d"),
+    (530, 380, "teaching", "F3c"),
+    (530, 420, "teaching", "F3a"),
+    (570, 420, "teaching", "F3b"),
+
+    # D3
+    (330, 380, "teaching", "D3c"),
+    (370, 380, "teaching", "D3d"),
+    (330, 420, "teaching", "D3a"),
+    (370, 420, "teaching", "D3b"),
+
+    # D1(new)
+    (330, 500, "academy", "D1c"),
+    (370, 520, "academy", "D1b"),
+    (330, 540, "academy", "D1a"),
+
+    # F1(new)
+    (530, 500, "service center", "F1c"),
+    (530, 540, "service center", "F1b"),
+    (570, 520, "service center", "F1a"),
+
+    # C1(new)
+    (235, 500, "academy", "C1c"),
+    (280, 520, "academy", "C1b"),
+    (235, 540, "academy", "C1a"),
+
+    # B1(new)
+    (100, 510, "academy", "B1d"),
+    (175, 520, "academy", "B1c"),
+    (100, 540, "academy", "B1a"),
+    (135, 540, "academy", "B1b"),
+    (125, 475, "canteen", "B1e"),
+
+    # B2(new)
+    (158, 390, "playground", "B2"),
+
+    # E1(new)
+    (425, 500, "square", "E1"),
+
+    # C3&2(new)
+    (235, 375, "service center", "C3c"),
+    (280, 375, "service center", "C3b"),
+    (235, 415, "service center", "C3a"),
+    (235, 445, "academy", "C2a"),
+    (280, 430, "academy", "C2b"),
+
+    # E3
+    (430, 380, "library", "E3"),
+
+    # D6
+    (320, 77, "playground & gym", "D6"),  # 4新增
+
+    # A2b
+    (210, 185, "hospital", "A2b"),  # 8新增
+
+    # A3
+    (65, 370, "basketball ground", "A3"),  # 8新增
+
+    # E5
+    (435, 180, "innovative2", "Noodles"),
+    (465, 210, "innovative2", "McDonald"),
+]
+
+
+def campus_edges(matrix, outer_edges=OUTER_EDGES) -> List[Tuple[int, int]]:
+    """
+    Undirected edge list (1-based, a < b) to draw.
+
+    Built from the finite off-diagonal entries of the distance matrix, so the
+    drawn network is exactly the routable one, plus outer_edges for nodes
+    the matrix does not have.
+    """
+    n = 0 if matrix is None else len(matrix)
+    edges = []
+    if n:
+        has_edge = np.isfinite(np.asarray(matrix, dtype=np.float64))
+        has_edge |= has_edge.T  # one-way entries still draw one line
+        rows, cols = np.nonzero(np.triu(has_edge, k=1))
+        edges = list(zip((rows + 1).tolist(), (cols + 1).tolist()))
+    edges.extend(edge for edge in outer_edges if max(edge) > n)
+    return edges
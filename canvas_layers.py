@@ -0,0 +1,66 @@
+"""
+Fixed z-order layers on the campus canvas.
+
+Every item belongs to one layer through a "layer:<name>" tag, and each
+layer has an invisible marker item on top of it. New items are lowered
+under their layer's marker once, when they are created, so the stacking
+order never has to be repaired with per-frame tag_raise calls, and a layer
+is cleared, hidden or shown with a single tag operation.
+"""
+from typing import Dict
+
+import tkinter as tk
+
+# bottom to top
+LAYERS = ("background", "edges", "buildings", "routes", "agents", "overlays")
+
+
+class CanvasLayers:
+
+    def __init__(self, canvas: tk.Canvas, layers=LAYERS):
+        self.canvas = canvas
+        self.layers = tuple(layers)
+        self._markers: Dict[str, int] = {}
+        self.reset()
+
+    def reset(self):
+        """Recreate the markers, e.g. after canvas.delete("all")"""
+        for marker in self._markers.values():
+            self.canvas.delete(marker)
+        self._markers = {
+            name: self.canvas.create_line(0, 0, 0, 0, state=tk.HIDDEN, tags=(f"layer_top:{name}",))
+            for name in self.layers
+        }
+
+    @staticmethod
+    def tag(name: str) -> str:
+        return f"layer:{name}"
+
+    def tags(self, name: str, *tags) -> tuple:
+        """Tags for a new item of layer name, to pass as tags= on creation"""
+        return tags + (self.tag(name),)
+
+    def place(self, name: str, tag_or_id=None):
+        """
+        Put items on top of their layer, by default every item tagged with
+        it. One tag_lower keeps the items' relative order.
+        """
+        self.canvas.tag_lower(self.tag(name) if tag_or_id is None else tag_or_id, self._markers[name])
+
+    def add(self, name: str, tag_or_id):
+        """Tag existing items into layer name and stack them there"""
+        self.canvas.addtag_withtag(self.tag(name), tag_or_id)
+        self.place(name, tag_or_id)
+
+    def clear(self, name: str):
+        self.canvas.delete(self.tag(name))
+
+    def hide(self, name: str):
+        self.canvas.itemconfigure(self.tag(name), state=tk.HIDDEN)
+
+    def show(self, name: str):
+        self.canvas.itemconfigure(self.tag(name), state=tk.NORMAL)
+
+    def counts(self) -> Dict[str, int]:
+        """Items per layer, markers excluded"""
+        return {name: len(self.canvas.find_withtag(self.tag(name))) for name in self.layers}
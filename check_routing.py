@@ -0,0 +1,155 @@
+"""
+Consistency checks for the incremental routing code.
+
+    python check_routing.py
+    python check_routing.py --graphs 100 --updates 60 --seed 1
+
+update_apsp and FloydRouter.update_edges are compared with a full
+floyd_warshall_numpy solve after every random edge change. Each check
+prints ok / FAIL, the exit status is non-zero if any failed.
+"""
+import argparse
+import math
+import sys
+
+import numpy as np
+
+from bench_floyd import load_shipped_matrix, synthetic_graph
+from routing import CongestionRouter, create_router, floyd_warshall_numpy, get_path, update_apsp
+from simulation import SimulationEngine
+
+
+def line_graph(n, weight=10.0):
+    """0 - 1 - ... - n-1, both directions, with positions on a horizontal line"""
+    matrix = np.full((n, n), math.inf)
+    np.fill_diagonal(matrix, 0)
+    for a in range(n - 1):
+        matrix[a, a + 1] = matrix[a + 1, a] = weight
+    positions = {node + 1: (50.0 * node, 0.0) for node in range(n)}
+    return matrix, positions
+
+
+def same_as_full_solve(matrix, dist, next_hop) -> bool:
+    """Same distances as a fresh solve, and every next-hop path is that long"""
+    reference, _ = floyd_warshall_numpy(matrix)
+    if not np.array_equal(np.isinf(reference), np.isinf(dist)):
+        return False
+    finite = np.isfinite(reference)
+    if not np.allclose(reference[finite], np.asarray(dist)[finite]):
+        return False
+    n = len(matrix)
+    for start in range(0, n, max(1, n // 10)):
+        for end in range(n):
+            path = get_path(next_hop, start, end)
+            if not finite[start, end]:
+                if path:
+                    return False
+                continue
+            length = sum(matrix[a][b] for a, b in zip(path, path[1:]))
+            if not path or path[0] != start or path[-1] != end or not math.isclose(
+                    length, reference[start, end], rel_tol=1e-9, abs_tol=1e-9):
+                return False
+    return True
+
+
+def random_weight(rng):
+    """Closed edges, raises and cuts in about equal parts"""
+    kind = rng.integers(4)
+    if kind == 0:
+        return math.inf
+    return float(rng.integers(1, 3) if kind == 1 else rng.integers(1, 10) if kind == 2 else rng.integers(10, 30))
+
+
+def check_apsp_random(args):
+    """Random edge changes on random graphs, with and without the full-solve fallback"""
+    rng = np.random.default_rng(args.seed)
+    for graph in range(args.graphs):
+        V = int(rng.integers(5, 60))
+        matrix = synthetic_graph(V, seed=args.seed + graph).astype(np.float64)
+        dist, next_hop = floyd_warshall_numpy(matrix)
+        solver = floyd_warshall_numpy if graph % 2 else None
+        for _ in range(args.updates):
+            u, v = (int(x) for x in rng.integers(V, size=2))
+            update_apsp(matrix, dist, next_hop, u, v, random_weight(rng), solver)
+            if not same_as_full_solve(matrix, dist, next_hop):
+                print(f"  mismatch: graph {graph} ({V} nodes) after {u} -> {v}")
+                return False
+    return True
+
+
+def check_apsp_campus(args):
+    """Every campus edge raised and restored, then batches through update_edges"""
+    rng = np.random.default_rng(args.seed)
+    matrix = np.asarray(load_shipped_matrix(), dtype=np.float64)
+    router = create_router("floyd")
+    router.set_matrix(matrix.copy())
+    edges = [tuple(e) for e in np.argwhere(np.isfinite(matrix) & (matrix > 0)).tolist()]
+    for u, v in edges:
+        router.update_edge(u, v, matrix[u, v] * 3)
+        router.update_edge(u, v, matrix[u, v])
+    if not same_as_full_solve(router.matrix, router.dist, router.next_hop):
+        return False
+    for _ in range(5):
+        picked = rng.choice(len(edges), size=25, replace=False)
+        router.update_edges([(edges[i][0], edges[i][1], random_weight(rng)) for i in picked])
+        if not same_as_full_solve(router.matrix, router.dist, router.next_hop):
+            return False
+    return True
+
+
+def check_closed_edge_after_rebuild(args):
+    """
+    Close 2 <-> 3 while an agent walks 0 -> 3, then open 4 -> 0, which
+    rebuilds the CSR without the closed edge: the agent must stop at 2.
+    """
+    matrix, positions = line_graph(5)
+    router = CongestionRouter(positions)
+    router.set_matrix(matrix)
+    engine = SimulationEngine(router, {1: [("08:00", 1, 4)]}, start_minute=470)
+    engine.advance_to(480.1)
+
+    router.update_edge(2, 3, math.inf)
+    router.update_edge(3, 2, math.inf)
+    router.update_edge(4, 0, 10.0)
+    if not math.isinf(router.slowdown(2, 3)) or not math.isinf(router.edge_costs((1, 2, 3))[-1]):
+        return False
+
+    engine.advance_to(600)
+    last = engine.trajectory[-1]
+    return (last.kind, last.node) == ("no_path", 2) and not engine._queue and not any(router.load)
+
+
+def check_self_loop_ignored(args):
+    """update_edge(u, u, ...) must leave the diagonal at 0, also across a later full solve"""
+    matrix, positions = line_graph(4)
+    for name in ("floyd", "dijkstra", "astar", "congestion"):
+        router = create_router(name, positions)
+        router.set_matrix(matrix.copy())
+        router.update_edge(1, 1, math.inf)
+        router.update_edges([(2, 2, math.inf), (0, 1, 20.0), (1, 0, 20.0)])
+        router.set_matrix(router.matrix)
+        if router.matrix[1][1] != 0 or router.path(1, 1) != [1] or router.path(2, 2) != [2]:
+            return False
+    return True
+
+
+CHECKS = [check_apsp_random, check_apsp_campus, check_closed_edge_after_rebuild, check_self_loop_ignored]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--graphs", type=int, default=40, help="random graphs for check_apsp_random")
+    parser.add_argument("--updates", type=int, default=40, help="edge changes per random graph")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    failed = 0
+    for check in CHECKS:
+        ok = check(args)
+        failed += not ok
+        print(f"{check.__name__:<40}{'ok' if ok else 'FAIL':>6}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
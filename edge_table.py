@@ -0,0 +1,87 @@
+"""
+Columnar table of the drawn campus edges.
+
+Every attribute is a NumPy column indexed by edge id, computed for all
+edges at once, so routing and the info panels can query length, capacity
+or difficulty without per-line dicts of formatted strings.
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+CAPACITY_LABELS = ("Low (2-4 people)", "Medium (5-7 people)", "High (8-10 people)")
+DIFFICULTY_LABELS = ("Easy (Flat)", "Medium (Slight Slope)", "Hard (Stairs/Steep Slope)")
+
+# bucket limits, same thresholds draw_line always used
+CAPACITY_BINS = (50, 100)  # length
+DIFFICULTY_BINS = (20, 50)  # height difference
+# people an edge of each capacity class carries before it slows down
+CAPACITY_PEOPLE = (4, 7, 10)
+
+COLUMNS = ("start", "end", "x1", "y1", "x2", "y2", "length", "capacity", "difficulty")
+
+
+def capacity_class(length) -> np.ndarray:
+    """Index into CAPACITY_LABELS / CAPACITY_PEOPLE for canvas lengths"""
+    return np.digitize(length, CAPACITY_BINS).astype(np.int8)
+
+
+class EdgeTable:
+    """
+    Columns:
+        start, end: int32 node ids (1-based), -1 if the end is not a node
+        x1, y1, x2, y2: float64 canvas coordinates
+        length: float64 canvas length
+        capacity: int8 index into CAPACITY_LABELS
+        difficulty: int8 index into DIFFICULTY_LABELS
+    """
+
+    def __init__(self, start=(), end=(), x1=(), y1=(), x2=(), y2=()):
+        self.start = np.asarray(start, dtype=np.int32)
+        self.end = np.asarray(end, dtype=np.int32)
+        self.x1 = np.asarray(x1, dtype=np.float64)
+        self.y1 = np.asarray(y1, dtype=np.float64)
+        self.x2 = np.asarray(x2, dtype=np.float64)
+        self.y2 = np.asarray(y2, dtype=np.float64)
+
+        self.length = np.hypot(self.x2 - self.x1, self.y2 - self.y1)
+        self.capacity = capacity_class(self.length)
+        self.difficulty = np.digitize(np.abs(self.y2 - self.y1), DIFFICULTY_BINS).astype(np.int8)
+        self._by_nodes: Dict[Tuple[int, int], int] = None
+
+    @classmethod
+    def from_edges(cls, edges, node_positions) -> "EdgeTable":
+        """edges: [(start_node, end_node)] of 1-based ids present in node_positions"""
+        ids = np.asarray(list(edges), dtype=np.int32).reshape(-1, 2)
+        a = np.array([node_positions[n] for n in ids[:, 0].tolist()], dtype=np.float64).reshape(-1, 2)
+        b = np.array([node_positions[n] for n in ids[:, 1].tolist()], dtype=np.float64).reshape(-1, 2)
+        return cls(ids[:, 0], ids[:, 1], a[:, 0], a[:, 1], b[:, 0], b[:, 1])
+
+    def __len__(self):
+        return len(self.start)
+
+    def extend(self, other: "EdgeTable") -> "EdgeTable":
+        """New table with other's rows appended, edge ids of self are kept"""
+        return EdgeTable(*(np.concatenate([getattr(self, c), getattr(other, c)]) for c in COLUMNS[:6]))
+
+    def edge_id(self, start: int, end: int) -> int:
+        """Edge between two nodes in either direction, -1 if none"""
+        if self._by_nodes is None:
+            self._by_nodes = {}
+            for i, (a, b) in enumerate(zip(self.start.tolist(), self.end.tolist())):
+                self._by_nodes.setdefault((a, b), i)
+                self._by_nodes.setdefault((b, a), i)
+        return self._by_nodes.get((start, end), -1)
+
+    def _node_label(self, node: int) -> str:
+        return str(node) if node >= 0 else "None"
+
+    def info(self, edge_id: int) -> Dict[str, str]:
+        """Formatted attributes of one edge, for the info panel"""
+        return {
+            'nodes': f"Node {self._node_label(int(self.start[edge_id]))} to Node {self._node_label(int(self.end[edge_id]))}",
+            'length': f"{self.length[edge_id]:.1f} units",
+            'capacity': CAPACITY_LABELS[self.capacity[edge_id]],
+            'difficulty': DIFFICULTY_LABELS[self.difficulty[edge_id]],
+            'coords': tuple(float(c[edge_id]) for c in (self.x1, self.y1, self.x2, self.y2))
+        }
@@ -0,0 +1,28 @@
+"""Bounded LRU shared by the map tiles and the route cache"""
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Small ordered-dict LRU, oldest entry dropped past max_items"""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self.items = OrderedDict()
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.max_items:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
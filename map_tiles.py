@@ -0,0 +1,286 @@
+"""
+Tile pyramid for the Show Maps viewer.
+
+Each map is cut once into 256px tiles at full, 1/2, 1/4 ... resolution and
+stored next to the image in "<name>.tiles/", keyed by the sha256 of the
+image like the matrix cache. The viewer only decodes the tiles that are on
+screen, from the level closest to the current zoom, and keeps a bounded
+LRU of them, so zooming never resizes the full image again.
+
+Opening and cutting a map runs on a small thread pool (see run_in_background);
+a cheap draft decode is shown first and Tk only ever sees finished images.
+"""
+import json
+import math
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+import tkinter as tk
+from PIL import Image, ImageTk
+
+from lru import LRUCache
+from matrix_cache import file_hash
+
+PYRAMID_VERSION = 1
+TILE_SIZE = 256
+
+_executor = None
+# two windows may ask for the same pyramid at once, cut it only once
+_build_lock = threading.Lock()
+
+
+def default_tile_dir(image_path: str) -> str:
+    return os.path.splitext(image_path)[0] + ".tiles"
+
+
+def run_in_background(widget: tk.Misc, func: Callable, on_done: Callable, on_error: Callable = None,
+                      poll_ms: int = 30):
+    """
+    Run func() on the loader pool and hand its result to on_done on the Tk
+    thread. The worker never touches Tk; the main loop polls the future
+    with after(), and drops the result if the widget was closed meanwhile.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="map-loader")
+    future = _executor.submit(func)
+
+    def poll():
+        if not widget.winfo_exists():
+            return
+        if not future.done():
+            widget.after(poll_ms, poll)
+        elif future.exception() is not None:
+            if on_error is not None:
+                on_error(future.exception())
+        else:
+            on_done(future.result())
+
+    widget.after(poll_ms, poll)
+    return future
+
+
+def decode_preview(image_path: str, max_width: int, max_height: int) -> Image.Image:
+    """
+    Low-resolution decode for the first paint. JPEG is scaled by the decoder
+    itself (draft), other formats are box-reduced before the final resize.
+    """
+    image = Image.open(image_path)
+    image.draft("RGB", (max_width, max_height))
+    factor = min(image.width // max(max_width, 1), image.height // max(max_height, 1))
+    if factor > 1:
+        image = image.reduce(factor)
+    ratio = min(max_width / image.width, max_height / image.height)
+    size = (max(1, int(image.width * ratio)), max(1, int(image.height * ratio)))
+    return image.resize(size, Image.Resampling.BILINEAR)
+
+
+class TilePyramid:
+    """
+    Levels: level 0 is the full image, level k is scaled by 1 / 2**k, the
+    last level fits in a single tile.
+    """
+
+    def __init__(self, image_path: str, tile_dir: str = None, tile_size: int = TILE_SIZE,
+                 max_tiles: int = 256):
+        self.image_path = image_path
+        self.tile_dir = tile_dir or default_tile_dir(image_path)
+        self.tile_size = tile_size
+        self.levels: List[Tuple[int, int]] = []  # (width, height) per level
+        self.extension = ".png"
+        self.tiles = LRUCache(max_tiles)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.levels[0]
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.tile_dir, "manifest.json")
+
+    def load(self) -> "TilePyramid":
+        """Reuse the tiles on disk, or cut them if missing or stale"""
+        with _build_lock:
+            return self._load()
+
+    def _load(self) -> "TilePyramid":
+        digest = file_hash(self.image_path)
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if (manifest.get("version") == PYRAMID_VERSION and manifest.get("hash") == digest
+                    and manifest.get("tile_size") == self.tile_size):
+                self.levels = [tuple(level) for level in manifest["levels"]]
+                self.extension = manifest["extension"]
+                return self
+        except (OSError, ValueError, KeyError):
+            pass
+        self.build(digest)
+        return self
+
+    def build(self, digest: str):
+        image = Image.open(self.image_path)
+        # JPEG maps stay JPEG, anything else keeps its alpha in PNG
+        self.extension = ".jpg" if image.format == "JPEG" else ".png"
+        image = image.convert("RGB" if self.extension == ".jpg" else "RGBA")
+
+        shutil.rmtree(self.tile_dir, ignore_errors=True)
+        self.levels = []
+        level = 0
+        while True:
+            width, height = image.size
+            self.levels.append((width, height))
+            level_dir = os.path.join(self.tile_dir, str(level))
+            os.makedirs(level_dir, exist_ok=True)
+            for row in range(math.ceil(height / self.tile_size)):
+                for col in range(math.ceil(width / self.tile_size)):
+                    box = (col * self.tile_size, row * self.tile_size,
+                           min(width, (col + 1) * self.tile_size), min(height, (row + 1) * self.tile_size))
+                    image.crop(box).save(os.path.join(level_dir, f"{col}_{row}{self.extension}"))
+            if width <= self.tile_size and height <= self.tile_size:
+                break
+            image = image.reduce(2)
+            level += 1
+
+        # written last, a half-built pyramid is rebuilt on the next load
+        manifest = {"version": PYRAMID_VERSION, "hash": digest, "tile_size": self.tile_size,
+                    "extension": self.extension, "levels": self.levels}
+        with open(self._manifest_path(), "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+
+    def level_for(self, scale: float) -> int:
+        """Coarsest level that still has at least `scale` pixels per image pixel"""
+        level = int(math.floor(math.log2(1 / scale))) if scale < 1 else 0
+        return max(0, min(level, len(self.levels) - 1))
+
+    def grid(self, level: int) -> Tuple[int, int]:
+        width, height = self.levels[level]
+        return math.ceil(width / self.tile_size), math.ceil(height / self.tile_size)
+
+    def tile(self, level: int, col: int, row: int) -> Image.Image:
+        key = (level, col, row)
+        tile = self.tiles.get(key)
+        if tile is None:
+            path = os.path.join(self.tile_dir, str(level), f"{col}_{row}{self.extension}")
+            with Image.open(path) as f:
+                tile = f.copy()
+            self.tiles.put(key, tile)
+        return tile
+
+
+class TileViewer:
+    """
+    Draws a TilePyramid on a scrollable canvas.
+
+    Only the tiles intersecting the viewport are on the canvas; scrolling
+    adds the new ones and deletes those that left, zooming replaces them.
+    """
+
+    def __init__(self, canvas: tk.Canvas, pyramid: TilePyramid, scale: float = 1.0,
+                 min_scale: float = 0.05, max_scale: float = 4.0, max_photos: int = 128):
+        self.canvas = canvas
+        self.pyramid = pyramid
+        self.scale = scale
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.photos = LRUCache(max_photos)  # (level, col, row, width, height) -> PhotoImage
+        self.placed = {}  # (level, col, row) -> (canvas item, PhotoImage)
+
+        canvas.configure(xscrollcommand=self._scrolled_x, yscrollcommand=self._scrolled_y)
+        self._x_scrollbar = None
+        self._y_scrollbar = None
+
+        canvas.bind("<Configure>", lambda e: self.render())
+        canvas.bind("<MouseWheel>", self.on_mousewheel)
+        canvas.bind("<ButtonPress-1>", lambda e: canvas.scan_mark(e.x, e.y))
+        canvas.bind("<B1-Motion>", self.on_drag)
+
+    def attach_scrollbars(self, x_scrollbar, y_scrollbar):
+        self._x_scrollbar = x_scrollbar
+        self._y_scrollbar = y_scrollbar
+
+    def _scrolled_x(self, first, last):
+        if self._x_scrollbar is not None:
+            self._x_scrollbar.set(first, last)
+        self.render()
+
+    def _scrolled_y(self, first, last):
+        if self._y_scrollbar is not None:
+            self._y_scrollbar.set(first, last)
+        self.render()
+
+    def set_scale(self, scale: float, anchor_x: float = 0, anchor_y: float = 0):
+        """Zoom keeping the canvas point under (anchor_x, anchor_y) in place"""
+        scale = max(self.min_scale, min(self.max_scale, scale))
+        image_x = self.canvas.canvasx(anchor_x) / self.scale
+        image_y = self.canvas.canvasy(anchor_y) / self.scale
+        self.scale = scale
+
+        for item, _ in self.placed.values():
+            self.canvas.delete(item)
+        self.placed.clear()
+
+        width, height = self.pyramid.size
+        total_w, total_h = width * scale, height * scale
+        self.canvas.config(scrollregion=(0, 0, total_w, total_h))
+        self.canvas.xview_moveto(max(0.0, (image_x * scale - anchor_x) / total_w))
+        self.canvas.yview_moveto(max(0.0, (image_y * scale - anchor_y) / total_h))
+        self.render()
+
+    def fit(self, width: int, height: int):
+        """Largest zoom showing the whole map in width x height"""
+        map_w, map_h = self.pyramid.size
+        self.set_scale(min(width / map_w, height / map_h))
+
+    def render(self):
+        canvas = self.canvas
+        level = self.pyramid.level_for(self.scale)
+        # size of one level tile on the canvas
+        factor = self.scale * (2 ** level)
+        step = self.pyramid.tile_size * factor
+
+        left, top = canvas.canvasx(0), canvas.canvasy(0)
+        right = left + max(canvas.winfo_width(), 1)
+        bottom = top + max(canvas.winfo_height(), 1)
+        cols, rows = self.pyramid.grid(level)
+        col_range = range(max(0, int(left // step)), min(cols, int(right // step) + 1))
+        row_range = range(max(0, int(top // step)), min(rows, int(bottom // step) + 1))
+
+        visible = {(level, col, row) for col in col_range for row in row_range}
+        for key in [k for k in self.placed if k not in visible]:
+            canvas.delete(self.placed.pop(key)[0])
+
+        for key in visible:
+            if key in self.placed:
+                continue
+            _, col, row = key
+            # rounded edges of neighbouring tiles meet exactly, no 1px seams
+            x, y = round(col * step), round(row * step)
+            tile = self.pyramid.tile(*key)
+            size = (max(1, round((col * self.pyramid.tile_size + tile.width) * factor) - x),
+                    max(1, round((row * self.pyramid.tile_size + tile.height) * factor) - y))
+            photo = self._photo(key, tile, size)
+            # the canvas does not own the PhotoImage, keep it alive while shown
+            self.placed[key] = (canvas.create_image(x, y, image=photo, anchor="nw"), photo)
+
+    def _photo(self, key, tile: Image.Image, size: Tuple[int, int]):
+        photo_key = key + size
+        photo = self.photos.get(photo_key)
+        if photo is None:
+            if size != tile.size:
+                tile = tile.resize(size, Image.Resampling.BILINEAR)
+            photo = ImageTk.PhotoImage(tile)
+            self.photos.put(photo_key, photo)
+        return photo
+
+    def on_mousewheel(self, event):
+        if event.state & 4:  # Ctrl
+            self.set_scale(self.scale * (1.1 if event.delta > 0 else 0.9), event.x, event.y)
+        else:
+            self.canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
+
+    def on_drag(self, event):
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.render()
@@ -0,0 +1,154 @@
+"""
+Binary cache of the campus distance matrix and its shortest paths.
+
+The spreadsheet is read with a small zipfile/ElementTree reader instead of
+pandas + openpyxl, and the all-pairs solve would otherwise be redone after
+every parse. Both results are stored in one .npz next to the spreadsheet,
+keyed by the sha256 of the xlsx content, so a warm start reads three arrays
+and nothing else. Editing the spreadsheet changes the hash and the cache is
+rebuilt on the next start.
+"""
+import hashlib
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from routing import floyd_warshall_numpy
+
+CACHE_VERSION = 1
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def default_cache_path(xlsx_path: str) -> str:
+    return os.path.splitext(xlsx_path)[0] + ".cache.npz"
+
+
+_NS = {
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "rel": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "pkg": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+
+
+def _column_index(cell_ref: str) -> int:
+    letters = re.match(r"[A-Z]+", cell_ref).group()
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - ord("A") + 1
+    return index - 1
+
+
+def _cell_value(text):
+    try:
+        return float(text)  # also maps the "INF" text cells to inf
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+def read_xlsx_rows(xlsx_path: str):
+    """
+    Read the first worksheet of an xlsx as a list of rows of floats.
+
+    Only what the distance sheet needs: numbers and shared/inline strings,
+    empty cells become nan (same as pandas). No pandas/openpyxl involved.
+    """
+    with zipfile.ZipFile(xlsx_path) as z:
+        workbook = ET.fromstring(z.read("xl/workbook.xml"))
+        first_sheet = workbook.find("main:sheets/main:sheet", _NS)
+        rel_id = first_sheet.get(f"{{{_NS['rel']}}}id")
+        rels = ET.fromstring(z.read("xl/_rels/workbook.xml.rels"))
+        target = next(r.get("Target") for r in rels.findall("pkg:Relationship", _NS) if r.get("Id") == rel_id)
+        sheet_path = target.lstrip("/") if target.startswith("/") else "xl/" + target
+
+        shared = []
+        if "xl/sharedStrings.xml" in z.namelist():
+            for si in ET.fromstring(z.read("xl/sharedStrings.xml")).findall("main:si", _NS):
+                shared.append("".join(t.text or "" for t in si.iter(f"{{{_NS['main']}}}t")))
+
+        rows = {}
+        width = 0
+        sheet = ET.fromstring(z.read(sheet_path))
+        for row in sheet.iterfind("main:sheetData/main:row", _NS):
+            values = {}
+            for cell in row.findall("main:c", _NS):
+                kind = cell.get("t")
+                if kind == "inlineStr":
+                    text = "".join(t.text or "" for t in cell.iter(f"{{{_NS['main']}}}t"))
+                else:
+                    v = cell.find("main:v", _NS)
+                    text = None if v is None else v.text
+                    if kind == "s" and text is not None:
+                        text = shared[int(text)]
+                col = _column_index(cell.get("r"))
+                values[col] = _cell_value(text)
+                width = max(width, col + 1)
+            rows[int(row.get("r")) - 1] = values
+
+    height = max(rows) + 1 if rows else 0
+    return [[rows.get(r, {}).get(c, float('nan')) for c in range(width)] for r in range(height)]
+
+
+def read_matrix_xlsx(xlsx_path: str):
+    """Parse the spreadsheet into a distance matrix (inf = no edge)"""
+    distance_data = np.array(read_xlsx_rows(xlsx_path), dtype=np.float64)[1:, 1:]
+
+    # change 0 to INF
+    matrix = np.where(distance_data == 0, float('inf'), distance_data)
+    np.fill_diagonal(matrix, 0)
+    return matrix
+
+
+def read_cache(cache_path: str, source_hash: str):
+    """Returns (matrix, dist, next_hop) or None if missing / stale"""
+    try:
+        with np.load(cache_path) as data:
+            if int(data["version"]) != CACHE_VERSION or str(data["source_hash"]) != source_hash:
+                return None
+            return data["matrix"], data["dist"], data["next_hop"]
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+        # truncated or corrupt file, rebuilt like a stale one
+        return None
+
+
+def write_cache(cache_path: str, source_hash: str, matrix, dist, next_hop):
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, version=CACHE_VERSION, source_hash=source_hash,
+                     matrix=matrix, dist=dist, next_hop=next_hop)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        # read-only install dir: keep running, just without a warm start
+        print(f"Could not write matrix cache {cache_path}: {e}")
+
+
+def load_matrix(xlsx_path: str, cache_path: str = None, solver=floyd_warshall_numpy):
+    """
+    Load the distance matrix with its all-pairs solution.
+
+    Returns:
+        matrix: distance matrix, inf where there is no edge
+        dist: all-pairs shortest distances
+        next_hop: int32 next-hop matrix for routing.get_path
+    """
+    cache_path = cache_path or default_cache_path(xlsx_path)
+    source_hash = file_hash(xlsx_path)
+
+    cached = read_cache(cache_path, source_hash)
+    if cached is not None:
+        return cached
+
+    matrix = read_matrix_xlsx(xlsx_path)
+    dist, next_hop = solver(matrix)
+    write_cache(cache_path, source_hash, matrix, dist, next_hop)
+    return matrix, dist, next_hop
@@ -0,0 +1,70 @@
+"""
+Coordinate lookups for campus nodes.
+
+NodeIndex answers "which node is at (x, y)" in O(1) with a reverse dict,
+and "which node is nearest to (x, y)" with a uniform grid, so mouse picks
+and draw_line do not scan every node.
+"""
+import math
+from typing import Dict, Optional, Tuple
+
+
+class NodeIndex:
+
+    def __init__(self, node_positions: Dict[int, Tuple[float, float]], cell_size: float = 25):
+        """
+        Args:
+            node_positions: node id -> (x, y)
+            cell_size: grid cell edge, roughly the typical distance between nodes
+        """
+        self.cell_size = cell_size
+        self.positions = dict(node_positions)
+        self.by_coord: Dict[Tuple[float, float], Tuple[int, ...]] = {}
+        self.grid: Dict[Tuple[int, int], list] = {}
+
+        for node, pos in sorted(self.positions.items()):
+            # several nodes may share a coordinate (37 and 38), keep all of them
+            self.by_coord[pos] = self.by_coord.get(pos, ()) + (node,)
+            self.grid.setdefault(self._cell(*pos), []).append(node)
+
+        cells = list(self.grid) or [(0, 0)]
+        self.bounds = (min(c[0] for c in cells), min(c[1] for c in cells),
+                       max(c[0] for c in cells), max(c[1] for c in cells))
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def at(self, x: float, y: float) -> Optional[int]:
+        """Node exactly at (x, y), the lowest id if several share it"""
+        nodes = self.by_coord.get((x, y))
+        return nodes[0] if nodes else None
+
+    def nearest(self, x: float, y: float, max_distance: float = None) -> Optional[int]:
+        """Closest node to (x, y), None if nothing within max_distance"""
+        if not self.positions:
+            return None
+
+        cx, cy = self._cell(x, y)
+        min_x, min_y, max_x, max_y = self.bounds
+        max_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy, 0)
+        limit = float('inf') if max_distance is None else max_distance
+        best, best_dist = None, float('inf')
+
+        for ring in range(max_ring + 1):
+            for gx in range(cx - ring, cx + ring + 1):
+                for gy in range(cy - ring, cy + ring + 1):
+                    if max(abs(gx - cx), abs(gy - cy)) != ring:
+                        continue
+                    for node in self.grid.get((gx, gy), ()):
+                        px, py = self.positions[node]
+                        d = math.hypot(px - x, py - y)
+                        if d < best_dist:
+                            best, best_dist = node, d
+            # every node in the next rings is at least ring * cell_size away
+            reach = ring * self.cell_size
+            if best_dist <= reach or reach > limit:
+                break
+
+        if best_dist > limit:
+            return None
+        return best
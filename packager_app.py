@@ -28,7 +28,6 @@ def create_exe():
         '--add-data', f'map2.png{os.pathsep}.',
 
         # 添加必需的库
-        '--hidden-import', 'pandas',
         '--hidden-import', 'numpy',
         '--hidden-import', 'tkinter',
         '--hidden-import', 'Pillow',  # 改为 Pillow
@@ -41,6 +40,7 @@ def create_exe():
         '--exclude-module', 'PySide2',
         '--exclude-module', 'nltk',
         '--exclude-module', 'scipy',
+        '--exclude-module', 'pandas',  # matrix_cache 自带 xlsx 读取
         # 调试选项
         '--debug', 'all'
     ]
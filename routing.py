@@ -0,0 +1,805 @@
+"""Shortest path routing for the campus graph"""
+import bisect
+import heapq
+import itertools
+import math
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from edge_table import CAPACITY_PEOPLE, EdgeTable
+from lru import LRUCache
+
+# every weight change of any router takes a new number, so a cached route
+# is never served for another graph, nor for another router after a switch
+_graph_versions = itertools.count(1)
+
+
+def floyd_warshall(graph):
+    """All-pairs shortest paths, returns (dist, next-hop matrix)"""
+    V = len(graph)
+    dist = graph.copy()
+    path = [[j if graph[i][j] != float('inf') else -1 for j in range(V)] for i in range(V)]
+
+    for k in range(V):
+        for i in range(V):
+            for j in range(V):
+                if dist[i][k] != float('inf') and dist[k][j] != float('inf'):
+                    if dist[i][j] > dist[i][k] + dist[k][j]:
+                        dist[i][j] = dist[i][k] + dist[k][j]
+                        path[i][j] = path[i][k]
+    return dist, path
+
+
+def floyd_warshall_numpy(graph):
+    """
+    Vectorized Floyd-Warshall.
+
+    For every k the whole matrix is relaxed at once through the k-th column
+    and row with broadcasting. Ties are kept (strict improvement only), so
+    dist and next-hop match floyd_warshall() exactly.
+
+    Returns:
+        dist: float64 (V, V) distance matrix
+        next_hop: int32 (V, V) matrix, -1 where no path exists
+    """
+    dist = np.array(graph, dtype=np.float64)
+    V = dist.shape[0]
+    next_hop = np.where(np.isinf(dist), -1, np.arange(V, dtype=np.int32)[None, :]).astype(np.int32)
+
+    candidate = np.empty_like(dist)
+    improved = np.empty(dist.shape, dtype=bool)
+    for k in range(V):
+        np.add(dist[:, k, None], dist[None, k, :], out=candidate)
+        np.less(candidate, dist, out=improved)
+        np.minimum(dist, candidate, out=dist)
+        # via k, the first hop is the first hop towards k
+        np.copyto(next_hop, next_hop[:, k, None], where=improved)
+    return dist, next_hop
+
+
+def update_apsp(matrix, dist, next_hop, u: int, v: int, weight: float, solver=floyd_warshall_numpy) -> int:
+    """
+    Set matrix[u][v] = weight and repair dist / next_hop in place.
+
+    Lower weight: every pair may now go through u -> v, one vectorized
+    O(V^2) relaxation. Higher weight (inf closes the edge): only pairs whose
+    next-hop path uses u -> v can change; the affected sources of all
+    targets behind the edge are settled again by one lock-step Dijkstra
+    seeded from the unaffected ones (Ramalingam-Reps). When that would take
+    more vectorized rounds than a full solve, solver(matrix) runs instead.
+
+    Distances always equal a full solve; between equally short paths the
+    repaired next hop may pick a different one.
+
+    Returns:
+        number of (source, target) pairs whose distance was recomputed
+    """
+    if u == v:
+        # the diagonal stays 0, a node is always reachable from itself
+        return 0
+    old = matrix[u][v]
+    matrix[u][v] = weight
+    if weight == old:
+        return 0
+    V = dist.shape[0]
+
+    if weight < old:
+        candidate = dist[:, u, None] + weight + dist[None, v, :]
+        improved = candidate < dist
+        np.minimum(dist, candidate, out=dist)
+        # from u the first hop is v itself, from anywhere else the hop towards u
+        first = next_hop[:, u].copy()
+        first[u] = v
+        np.copyto(next_hop, np.broadcast_to(first[:, None], dist.shape), where=improved)
+        return int(improved.sum())
+
+    # targets reached from u through the edge
+    targets = np.flatnonzero(next_hop[u] == v)
+    if targets.size == 0:
+        return 0
+
+    # sources whose path to each target passes u, found by following the
+    # next-hop trees of all those targets at once
+    hops = next_hop[:, targets]
+    through_u = np.zeros((V, targets.size), dtype=bool)
+    through_u[u] = True
+    cols = np.arange(targets.size)
+    valid = hops >= 0
+    safe_hops = np.where(valid, hops, 0)
+    rounds = 0
+    while True:
+        rounds += 1
+        grown = through_u | (valid & through_u[safe_hops, cols])
+        if np.array_equal(grown, through_u):
+            break
+        through_u = grown
+
+    weights = np.asarray(matrix, dtype=np.float64)
+    sources = np.flatnonzero(through_u.any(axis=1))
+    affected = through_u[sources]
+    finite = np.isfinite(weights[sources])
+    finite[np.arange(sources.size), sources] = False
+    degree = max(1, int(finite.sum(axis=1).max()))
+    rounds += degree + int(affected.sum(axis=0).max())
+    # a repair round costs about one k step of floyd_warshall_numpy on the
+    # campus graph (and less on larger ones), which takes V of them
+    if solver is not None and rounds > V:
+        solved_dist, solved_next = solver(weights)
+        dist[...] = solved_dist
+        next_hop[...] = solved_next
+        return dist.size
+
+    # every affected source of every target is settled in one lock-step
+    # Dijkstra over the (sources x targets) block, one column per target
+    block = np.ix_(sources, targets)
+    rows = np.arange(sources.size)
+
+    # best exit to an unaffected node, whose distance is still exact; one
+    # pass per neighbour slot keeps memory at sources x targets
+    exact = np.where(through_u, np.inf, dist[:, targets])
+    sub = weights[sources].copy()
+    sub[rows, sources] = np.inf
+    slots = np.argsort(~finite, axis=1, kind="stable")[:, :degree]
+    d = np.where(affected, np.inf, dist[block])
+    hop = np.where(affected, -1, next_hop[block]).astype(np.int64)
+    for slot in slots.T:
+        candidate = sub[rows, slot][:, None] + exact[slot]
+        better = candidate < d
+        better &= affected
+        np.copyto(d, candidate, where=better)
+        np.copyto(hop, slot[:, None], where=better)
+
+    inner = weights[np.ix_(sources, sources)]
+    pending = np.where(affected, d, np.inf)
+    cols = np.arange(targets.size)
+    for _ in range(int(affected.sum(axis=0).max())):
+        k = pending.argmin(axis=0)
+        best = pending[k, cols]
+        if not np.isfinite(best).any():
+            break
+        pending[k, cols] = np.inf
+        # settled entries never improve again, weights are not negative
+        candidate = inner[:, k] + best
+        better = candidate < d
+        better &= affected
+        np.copyto(d, candidate, where=better)
+        np.copyto(pending, candidate, where=better)
+        np.copyto(hop, sources[k], where=better)
+
+    hop[np.isinf(d)] = -1
+    dist[block] = d
+    next_hop[block] = hop
+    return int(affected.sum())
+
+
+class PathBatch(NamedTuple):
+    """
+    Many routes in CSR layout: route i is nodes[offsets[i]:offsets[i + 1]].
+
+    distance: float64 (N,), inf where no path exists (and the route is empty)
+    offsets: int64 (N + 1,)
+    nodes: int32, 0-based node indexes of every route back to back
+    """
+    distance: np.ndarray
+    offsets: np.ndarray
+    nodes: np.ndarray
+
+    def __len__(self):
+        return len(self.distance)
+
+    def path(self, i: int) -> List[int]:
+        return self.nodes[self.offsets[i]:self.offsets[i + 1]].tolist()
+
+
+def _pack_paths(distance, paths) -> PathBatch:
+    """PathBatch from a list of node lists"""
+    counts = np.fromiter((len(p) for p in paths), dtype=np.int64, count=len(paths))
+    offsets = np.zeros(len(paths) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    nodes = np.fromiter((n for p in paths for n in p), dtype=np.int32, count=int(offsets[-1]))
+    return PathBatch(np.asarray(distance, dtype=np.float64), offsets, nodes)
+
+
+def batch_paths(dist, next_hop, starts, ends) -> PathBatch:
+    """
+    Walk the next-hop matrix for all (starts[i], ends[i]) at once.
+
+    Every step advances all unfinished routes with one fancy-indexed
+    lookup, so the Python loop runs once per hop of the longest route
+    instead of once per node of every route.
+    """
+    next_hop = np.asarray(next_hop)
+    starts = np.asarray(starts, dtype=np.int64).ravel()
+    ends = np.asarray(ends, dtype=np.int64).ravel()
+    V = next_hop.shape[0]
+    valid = (starts >= 0) & (starts < V) & (ends >= 0) & (ends < V)
+    safe_starts, safe_ends = np.where(valid, starts, 0), np.where(valid, ends, 0)
+    reachable = valid & (next_hop[safe_starts, safe_ends] != -1)
+
+    distance = np.full(starts.size, np.inf)
+    distance[reachable] = np.asarray(dist, dtype=np.float64)[safe_starts[reachable], safe_ends[reachable]]
+
+    current = np.where(reachable, safe_starts, -1)
+    steps = []
+    active = reachable.copy()
+    while active.any():
+        steps.append(np.where(active, current, -1))
+        active &= current != safe_ends
+        current = np.where(active, next_hop[np.where(active, current, 0), safe_ends], -1)
+
+    if not steps:
+        return PathBatch(distance, np.zeros(starts.size + 1, dtype=np.int64), np.zeros(0, dtype=np.int32))
+    # (queries, hops), row-major masking keeps every route contiguous
+    table = np.stack(steps, axis=1)
+    used = table >= 0
+    offsets = np.zeros(starts.size + 1, dtype=np.int64)
+    np.cumsum(used.sum(axis=1), out=offsets[1:])
+    return PathBatch(distance, offsets, table[used].astype(np.int32))
+
+
+def get_path(path_matrix, start, end) -> List[int]:
+    """Walk the next-hop matrix from start to end (0-based node index)"""
+    if path_matrix[start][end] == -1:
+        return []
+
+    path = [start]
+    while start != end:
+        start = int(path_matrix[start][end])
+        path.append(start)
+    return path
+
+
+class FloydRouter:
+    """
+    Caches the all-pairs result of one distance matrix.
+
+    The matrix is solved once in set_matrix(); every later query reuses the
+    same dist / next-hop matrices until a different matrix is assigned.
+    """
+
+    def __init__(self, solver=floyd_warshall_numpy):
+        self.solver = solver
+        self.matrix = None
+        self.dist = None
+        self.next_hop = None
+        self.graph_version = next(_graph_versions)
+
+    def set_matrix(self, matrix, solved=None):
+        """solved: optional (dist, next_hop) already computed for matrix"""
+        self.matrix = matrix
+        self.graph_version = next(_graph_versions)
+        if matrix is None:
+            self.dist = None
+            self.next_hop = None
+        elif solved is not None:
+            self.dist, self.next_hop = solved
+        else:
+            self.dist, self.next_hop = self.solver(matrix)
+
+    def ensure(self, matrix):
+        """Recompute only if matrix is not the one already solved"""
+        if matrix is not self.matrix:
+            self.set_matrix(matrix)
+
+    def update_edge(self, u: int, v: int, weight: float) -> int:
+        """
+        Change one directed edge (0-based, inf closes it) without a new
+        all-pairs solve, see update_apsp. Footpaths need both directions.
+        """
+        self.dist = np.asarray(self.dist, dtype=np.float64)
+        self.next_hop = np.asarray(self.next_hop, dtype=np.int32)
+        self.graph_version = next(_graph_versions)
+        return update_apsp(self.matrix, self.dist, self.next_hop, u, v, weight, self.solver)
+
+    def update_edges(self, changes) -> int:
+        """
+        Apply many (u, v, weight) changes. More than one increase, e.g. the
+        rain toggle, is cheaper as a single solve than repair after repair.
+        """
+        changes = [(u, v, weight) for u, v, weight in changes if u != v]
+        if sum(weight > self.matrix[u][v] for u, v, weight in changes) <= 1:
+            return sum(self.update_edge(u, v, weight) for u, v, weight in changes)
+        for u, v, weight in changes:
+            self.matrix[u][v] = weight
+        self.set_matrix(self.matrix)
+        return len(self.dist) ** 2
+
+    def path(self, start: int, end: int) -> List[int]:
+        if self.next_hop is None or not (0 <= start < len(self.next_hop) and 0 <= end < len(self.next_hop)):
+            return []
+        return get_path(self.next_hop, start, end)
+
+    def distance(self, start: int, end: int) -> Optional[float]:
+        if self.dist is None:
+            return None
+        return self.dist[start][end]
+
+    def paths(self, starts, ends) -> PathBatch:
+        """Routes for arrays of (start, end) pairs in one call, see batch_paths"""
+        if self.next_hop is None:
+            return _pack_paths(np.full(len(starts), np.inf), [[] for _ in range(len(starts))])
+        return batch_paths(self.dist, self.next_hop, starts, ends)
+
+
+def to_csr(matrix):
+    """
+    Convert a dense distance matrix (inf = no edge) into CSR arrays.
+
+    Returns:
+        indptr: int32 (V + 1,), edges of node i are indptr[i]:indptr[i + 1]
+        indices: int32 (E,) target node of every edge
+        weights: float64 (E,) edge length
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    has_edge = np.isfinite(matrix)
+    np.fill_diagonal(has_edge, False)
+    rows, cols = np.nonzero(has_edge)
+    indptr = np.zeros(matrix.shape[0] + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=matrix.shape[0]), out=indptr[1:])
+    return indptr, cols.astype(np.int32), matrix[rows, cols]
+
+
+class DijkstraRouter:
+    """
+    Point-to-point queries answered on demand with a binary heap.
+
+    Nothing is precomputed except the CSR adjacency, so a query costs
+    O(E log V) instead of the O(V^3) all-pairs solve.
+    """
+
+    def __init__(self):
+        self.matrix = None
+        self.indptr = None
+        self.indices = None
+        self.weights = None
+        self.graph_version = next(_graph_versions)
+
+    def set_matrix(self, matrix, solved=None):
+        # all-pairs results are not needed for on-demand queries
+        self.matrix = matrix
+        self.graph_version = next(_graph_versions)
+        if matrix is None:
+            self.indptr = self.indices = self.weights = None
+            return
+        indptr, indices, weights = to_csr(matrix)
+        # plain lists are much faster to index from the Python heap loop
+        self.indptr = indptr.tolist()
+        self.indices = indices.tolist()
+        self.weights = weights.tolist()
+
+    def ensure(self, matrix):
+        if matrix is not self.matrix:
+            self.set_matrix(matrix)
+
+    def update_edge(self, u: int, v: int, weight: float) -> int:
+        """Change one directed edge (0-based, inf closes it), queries need no repair"""
+        if u == v:
+            return 0
+        self.matrix[u][v] = weight
+        self.graph_version = next(_graph_versions)
+        e = self._find_edge(u, v)
+        if e is None:
+            if math.isfinite(weight):
+                # a new edge changes the CSR layout
+                self.set_matrix(self.matrix)
+            return 0
+        # an inf weight is never relaxed, the edge can stay in place
+        self._set_weight(e, weight)
+        return 0
+
+    def update_edges(self, changes) -> int:
+        """Apply many (u, v, weight) changes, see update_edge"""
+        return sum(self.update_edge(u, v, weight) for u, v, weight in changes)
+
+    def _find_edge(self, u: int, v: int) -> Optional[int]:
+        for e in range(self.indptr[u], self.indptr[u + 1]):
+            if self.indices[e] == v:
+                return e
+        return None
+
+    def _set_weight(self, e: int, weight: float):
+        self.weights[e] = weight
+
+    def heuristic(self, node: int, end: int) -> float:
+        return 0.0
+
+    def search(self, start: int, end: int):
+        """Returns (distance, path), (inf, []) if end is unreachable"""
+        if self.indptr is None or not (0 <= start < len(self.indptr) - 1 and 0 <= end < len(self.indptr) - 1):
+            return float('inf'), []
+
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        dist = {start: 0.0}
+        prev = {start: -1}
+        done = set()
+        heap = [(self.heuristic(start, end), start)]
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            if node == end:
+                break
+            done.add(node)
+            base = dist[node]
+            for e in range(indptr[node], indptr[node + 1]):
+                nxt = indices[e]
+                cost = base + weights[e]
+                if cost < dist.get(nxt, float('inf')):
+                    dist[nxt] = cost
+                    prev[nxt] = node
+                    heapq.heappush(heap, (cost + self.heuristic(nxt, end), nxt))
+
+        if end not in dist:
+            return float('inf'), []
+
+        path = [end]
+        while prev[path[-1]] != -1:
+            path.append(prev[path[-1]])
+        path.reverse()
+        return dist[end], path
+
+    def path(self, start: int, end: int) -> List[int]:
+        return self.search(start, end)[1]
+
+    def _tree(self, start: int):
+        """Single-source Dijkstra without a target, (dist, prev) dicts"""
+        indptr, indices, weights = self.indptr, self.indices, self.weights
+        dist = {start: 0.0}
+        prev = {start: -1}
+        done = set()
+        heap = [(0.0, start)]
+        while heap:
+            base, node = heapq.heappop(heap)
+            if node in done:
+                continue
+            done.add(node)
+            for e in range(indptr[node], indptr[node + 1]):
+                nxt = indices[e]
+                cost = base + weights[e]
+                if cost < dist.get(nxt, float('inf')):
+                    dist[nxt] = cost
+                    prev[nxt] = node
+                    heapq.heappush(heap, (cost, nxt))
+        return dist, prev
+
+    def paths(self, starts, ends) -> PathBatch:
+        """
+        Routes for arrays of (start, end) pairs in one call. Pairs sharing a
+        start are answered from one shortest-path tree, so a departure wave
+        from a few dormitories costs a few searches.
+        """
+        starts = np.asarray(starts, dtype=np.int64).ravel().tolist()
+        ends = np.asarray(ends, dtype=np.int64).ravel().tolist()
+        V = len(self.indptr) - 1 if self.indptr is not None else 0
+        trees = {}
+        distance, paths = [], []
+        for start, end in zip(starts, ends):
+            if not (0 <= start < V and 0 <= end < V):
+                distance.append(float('inf'))
+                paths.append([])
+                continue
+            if start not in trees:
+                trees[start] = self._tree(start)
+            dist, prev = trees[start]
+            if end not in dist:
+                distance.append(float('inf'))
+                paths.append([])
+                continue
+            path = [end]
+            while prev[path[-1]] != -1:
+                path.append(prev[path[-1]])
+            path.reverse()
+            distance.append(dist[end])
+            paths.append(path)
+        return _pack_paths(distance, paths)
+
+    def distance(self, start: int, end: int) -> Optional[float]:
+        if self.indptr is None:
+            return None
+        return self.search(start, end)[0]
+
+
+class AStarRouter(DijkstraRouter):
+    """
+    Dijkstra guided by the straight-line distance between node_positions.
+
+    Matrix weights and canvas coordinates use different units, so the
+    Euclidean distance is scaled by the smallest weight/length ratio over
+    all edges; that keeps the heuristic admissible and consistent.
+    """
+
+    def __init__(self, node_positions: Dict[int, tuple]):
+        super().__init__()
+        self.node_positions = node_positions  # 1-based node id -> (x, y)
+        self.coords = []
+        self.scale = 0.0
+
+    def set_matrix(self, matrix, solved=None):
+        super().set_matrix(matrix)
+        self.coords = []
+        self.scale = 0.0
+        if matrix is None:
+            return
+
+        self.coords = [self.node_positions.get(i + 1) for i in range(len(self.indptr) - 1)]
+        ratios = []
+        for node in range(len(self.coords)):
+            for e in range(self.indptr[node], self.indptr[node + 1]):
+                a, b = self.coords[node], self.coords[self.indices[e]]
+                if a is None or b is None:
+                    continue
+                length = math.hypot(a[0] - b[0], a[1] - b[1])
+                if length > 0:
+                    ratios.append(self.weights[e] / length)
+        # any node without coordinates disables the guidance (plain Dijkstra)
+        if ratios and all(c is not None for c in self.coords):
+            self.scale = min(ratios)
+
+    def _set_weight(self, e: int, weight: float):
+        super()._set_weight(e, weight)
+        self._lower_scale(e, weight)
+
+    def _lower_scale(self, e: int, weight: float):
+        if not self.scale:
+            return
+        node = bisect.bisect_right(self.indptr, e) - 1
+        a, b = self.coords[node], self.coords[self.indices[e]]
+        length = math.hypot(a[0] - b[0], a[1] - b[1])
+        if length > 0:
+            # a cheaper edge must not make the heuristic overestimate
+            self.scale = min(self.scale, weight / length)
+
+    def heuristic(self, node: int, end: int) -> float:
+        if not self.scale:
+            return 0.0
+        a, b = self.coords[node], self.coords[end]
+        return self.scale * math.hypot(a[0] - b[0], a[1] - b[1])
+
+
+class CongestionRouter(AStarRouter):
+    """
+    A* on edge costs inflated by the agents currently walking them.
+
+    Each edge gets the capacity of its class in edge_table (Low 4, Medium 7,
+    High 10 people, from the drawn length) and a BPR cost
+
+        cost = free cost * min(max_slowdown, 1 + alpha * (load / capacity) ** beta)
+
+    Loads change one edge at a time through enter_edge / leave_edge, so a
+    cost update is O(1) and nothing is ever solved for all pairs. Costs only
+    grow, so the A* heuristic stays admissible.
+    """
+
+    def __init__(self, node_positions: Dict[int, tuple], alpha: float = 0.15, beta: float = 4.0,
+                 max_slowdown: float = 5.0, replan_margin: float = 0.1):
+        """
+        Args:
+            alpha, beta: BPR parameters, 0.15 / 4 are the classic values
+            max_slowdown: a crowd slows walkers down but never stops them,
+                unlike road traffic, so the factor is capped
+            replan_margin: a new route must be this much cheaper than the rest
+                of the current one, so agents do not flip between equal routes
+        """
+        super().__init__(node_positions)
+        self.alpha = alpha
+        self.beta = beta
+        self.max_slowdown = max_slowdown
+        self.replan_margin = replan_margin
+        self.free_weights = []
+        self.capacity = []
+        self.load = []
+        self._edge = {}  # (u, v) -> CSR edge index
+
+    def set_matrix(self, matrix, solved=None):
+        super().set_matrix(matrix)
+        self.free_weights = list(self.weights or ())
+        self.load = [0] * len(self.free_weights)
+        self._edge = {}
+        if matrix is None:
+            self.capacity = []
+            return
+
+        nodes = []  # 1-based (start, end) of every CSR edge
+        for node in range(len(self.indptr) - 1):
+            for e in range(self.indptr[node], self.indptr[node + 1]):
+                self._edge[(node, self.indices[e])] = e
+                nodes.append((node + 1, self.indices[e] + 1))
+        # the capacity class shown in the edge info panel
+        table = EdgeTable.from_edges([(a, b) for a, b in nodes
+                                      if a in self.node_positions and b in self.node_positions],
+                                     self.node_positions)
+        classes = table.capacity.tolist()
+        self.capacity = []
+        for a, b in nodes:
+            row = table.edge_id(a, b)
+            # no coordinates: treat as a medium path
+            self.capacity.append(CAPACITY_PEOPLE[classes[row] if row >= 0 else 1])
+
+    def _both_ways(self, u: int, v: int):
+        # a footpath is shared by people walking either way
+        return [e for e in (self._edge.get((u, v)), self._edge.get((v, u))) if e is not None]
+
+    def _bpr(self, e: int) -> float:
+        return min(self.max_slowdown, 1 + self.alpha * (self.load[e] / self.capacity[e]) ** self.beta)
+
+    def _add_load(self, u: int, v: int, delta: int):
+        for e in self._both_ways(u, v):
+            self.load[e] = max(0, self.load[e] + delta)
+            self.weights[e] = self.free_weights[e] * self._bpr(e)
+        # live costs, routes cached before this load change may be stale
+        self.graph_version = next(_graph_versions)
+
+    def update_edge(self, u: int, v: int, weight: float) -> int:
+        edges, load = self._edge, self.load
+        changed = super().update_edge(u, v, weight)
+        if self._edge is not edges:
+            # a new edge rebuilt the CSR, agents still walking keep loading
+            # their edges, matched by (u, v)
+            for key, e in edges.items():
+                new = self._edge.get(key)
+                if load[e] and new is not None:
+                    self.load[new] = load[e]
+                    self.weights[new] = self.free_weights[new] * self._bpr(new)
+        return changed
+
+    def _set_weight(self, e: int, weight: float):
+        # the free cost changes, the current load still applies on top
+        self.free_weights[e] = weight
+        DijkstraRouter._set_weight(self, e, weight * self._bpr(e))
+        # loads only raise costs, the heuristic must hold for the free cost
+        self._lower_scale(e, weight)
+
+    def slowdown(self, u: int, v: int) -> float:
+        """Current cost / free cost of edge u -> v, inf if the edge is closed"""
+        e = self._edge.get((u, v))
+        # a CSR rebuild drops closed edges, a missing edge is closed too
+        if e is None or not math.isfinite(self.free_weights[e]):
+            return math.inf
+        if not self.free_weights[e]:
+            return 1.0
+        return self.weights[e] / self.free_weights[e]
+
+    def enter_edge(self, u: int, v: int) -> float:
+        """An agent starts walking u -> v, returns the slowdown it walks at"""
+        self._add_load(u, v, 1)
+        return self.slowdown(u, v)
+
+    def leave_edge(self, u: int, v: int):
+        self._add_load(u, v, -1)
+
+    def clear_loads(self):
+        """Back to free flow, e.g. when the simulation with agents still walking is dropped"""
+        self.load = [0] * len(self.load)
+        self.weights = list(self.free_weights)
+        self.graph_version = next(_graph_versions)
+
+    def edge_costs(self, path) -> List[float]:
+        """Current cost of every edge of path (inf if closed), kept by the caller as the planned costs"""
+        edges = [self._edge.get((a, b)) for a, b in zip(path, path[1:])]
+        return [math.inf if e is None else self.weights[e] for e in edges]
+
+    def replan(self, path, hop: int, planned_costs: List[float]) -> Optional[List[int]]:
+        """
+        New rest of the route from path[hop], or None to keep it.
+
+        Only agents whose remaining edges got noticeably more expensive than
+        planned_costs (see edge_costs) search again, with a single A* from
+        where they stand.
+        """
+        rest = path[hop:]
+        if len(rest) < 2:
+            return None
+        current = sum(self.edge_costs(rest))
+        if current <= sum(planned_costs[hop:]) * (1 + self.replan_margin):
+            return None
+        cost, new_rest = self.search(rest[0], rest[-1])
+        if new_rest and new_rest != list(rest) and cost < current * (1 - self.replan_margin):
+            return new_rest
+        return None
+
+
+ROUTERS = {
+    "floyd": "Floyd-Warshall (all pairs)",
+    "dijkstra": "Dijkstra (on demand)",
+    "astar": "A* (on demand)",
+    "congestion": "A* with congestion (live load)",
+}
+
+
+def create_router(name: str, node_positions: Optional[Dict[int, tuple]] = None):
+    """Build a routing backend by name, see ROUTERS"""
+    if name == "floyd":
+        return FloydRouter()
+    if name == "dijkstra":
+        return DijkstraRouter()
+    if name == "astar":
+        return AStarRouter(node_positions or {})
+    if name == "congestion":
+        return CongestionRouter(node_positions or {})
+    raise ValueError(f"Unknown routing backend: {name}")
+
+
+class Route(NamedTuple):
+    """
+    One route with its canvas geometry, shared read-only between callers.
+
+    nodes: 0-based node indexes
+    points: float64 (n, 2) canvas coordinates of the nodes with a position
+    arc: float64 (n,) cumulative canvas length along points, arc[0] == 0
+    """
+    nodes: Tuple[int, ...]
+    points: np.ndarray
+    arc: np.ndarray
+
+    @property
+    def length(self) -> float:
+        return float(self.arc[-1]) if len(self.arc) else 0.0
+
+
+def route_geometry(nodes: Sequence[int], node_positions: Dict[int, tuple]) -> Route:
+    """Polyline and arc length of a 0-based node path, nodes without position are skipped"""
+    nodes = tuple(int(n) for n in nodes)
+    points = np.array([node_positions[n + 1] for n in nodes if n + 1 in node_positions],
+                      dtype=np.float64).reshape(-1, 2)
+    arc = np.zeros(len(points))
+    if len(points) > 1:
+        np.cumsum(np.hypot(*np.diff(points, axis=0).T), out=arc[1:])
+    points.flags.writeable = False
+    arc.flags.writeable = False
+    return Route(nodes, points, arc)
+
+
+class RouteCache:
+    """
+    LRU of routes keyed by (start, end, graph_version).
+
+    The same trips repeat all day; a hit returns the node path with its
+    polyline and arc length already built. A weight change gives the router
+    a new graph_version, so entries of the old graph are never hit again
+    and age out of the LRU.
+    """
+
+    def __init__(self, router, node_positions: Dict[int, tuple], max_routes: int = 512):
+        self.router = router
+        self.node_positions = node_positions  # 1-based node id -> (x, y)
+        self.routes = LRUCache(max_routes)
+        self.hits = 0
+        self.misses = 0
+
+    def route(self, start: int, end: int) -> Route:
+        """Shortest route from start to end (0-based), nodes is empty if there is none"""
+        key = (start, end, self.router.graph_version)
+        route = self.routes.get(key)
+        if route is not None:
+            self.hits += 1
+            return route
+        self.misses += 1
+        route = route_geometry(self.router.path(start, end), self.node_positions)
+        self.routes.put(key, route)
+        return route
+
+    def geometry(self, nodes: Sequence[int]) -> Route:
+        """
+        Route for a path found elsewhere, e.g. by the simulation engine on
+        the same router; the cached entry is reused if it is the same path.
+        """
+        nodes = tuple(nodes)
+        if not nodes:
+            return route_geometry(nodes, self.node_positions)
+        key = (nodes[0], nodes[-1], self.router.graph_version)
+        route = self.routes.get(key)
+        if route is not None and route.nodes == nodes:
+            self.hits += 1
+            return route
+        self.misses += 1
+        fresh = route_geometry(nodes, self.node_positions)
+        # found on this graph version, so it is a route for its end points
+        if route is None:
+            self.routes.put(key, fresh)
+        return fresh
+
+    def clear(self):
+        self.routes.clear()
+        self.hits = self.misses = 0
@@ -0,0 +1,122 @@
+"""
+Synthetic daily itineraries for load-testing the campus model.
+
+Builds seeded, reproducible schedules for any number of students from the
+building roles in campus_data.BUILDINGS, in the same
+(time, start_node, end_node) format as simulation.DEFAULT_SCHEDULES, so the
+result can be fed to SimulationEngine or to the GUI.
+"""
+import random
+from typing import Dict, List, Tuple
+
+from campus_data import BUILDINGS, NODE_POSITIONS
+from agents import format_time
+
+# role -> building types from the add_building table
+ROLE_TYPES = {
+    "dormitory": ("dormitory",),
+    "canteen": ("canteen", "innovative2"),
+    "teaching": ("teaching", "academy"),
+    "library": ("library",),
+    "sport": ("playground & gym", "playground", "basketball ground"),
+}
+
+
+def building_nodes(buildings=BUILDINGS, node_positions=NODE_POSITIONS, node_count: int = None) -> Dict[str, List[int]]:
+    """
+    Nodes of every role.
+
+    Args:
+        node_count: only keep nodes 1..node_count, e.g. len(floyd_matrix),
+            so every generated trip can be routed
+    """
+    node_at = {}
+    for node, pos in sorted(node_positions.items(), reverse=True):
+        node_at[pos] = node  # lowest id wins on shared coordinates
+
+    roles = {role: [] for role in ROLE_TYPES}
+    for x, y, building_type, _ in buildings:
+        node = node_at.get((x, y))
+        if node is None or (node_count is not None and node > node_count):
+            continue
+        for role, types in ROLE_TYPES.items():
+            if building_type in types:
+                roles[role].append(node)
+    return roles
+
+
+class _Day:
+    """Helper that chains legs so each starts where the previous one ended"""
+
+    def __init__(self, rng: random.Random, home: int):
+        self.rng = rng
+        self.here = home
+        self.time = 0
+        self.legs: List[Tuple[str, int, int]] = []
+
+    def go(self, earliest: int, latest: int, target: int):
+        minute = max(self.rng.randint(earliest, latest), self.time + 5)
+        if target == self.here or minute >= 24 * 60:
+            return
+        self.legs.append((format_time(minute), self.here, target))
+        self.here = target
+        self.time = minute
+
+
+def _hm(hours: int, minutes: int = 0) -> int:
+    return hours * 60 + minutes
+
+
+def generate_schedules(count: int, seed: int = 0, node_count: int = None,
+                       first_id: int = 1) -> Dict[int, List[Tuple[str, int, int]]]:
+    """
+    Args:
+        count: number of students
+        seed: same seed, same schedules
+        node_count: restrict buildings to routable nodes, see building_nodes
+        first_id: id of the first generated student
+
+    Returns:
+        student id -> [(time "HH:MM", start_node, end_node)], 1-based nodes
+    """
+    roles = building_nodes(node_count=node_count)
+    if not roles["dormitory"]:
+        raise ValueError("No dormitory node available for the generated schedules")
+
+    rng = random.Random(seed)
+
+    def pick(*preferred):
+        # first role that has any building, e.g. sport -> library -> dormitory
+        for role in preferred:
+            if roles[role]:
+                return rng.choice(roles[role])
+        return home
+
+    schedules = {}
+    for student in range(first_id, first_id + count):
+        home = rng.choice(roles["dormitory"])
+        day = _Day(rng, home)
+
+        # morning class
+        day.go(_hm(7, 40), _hm(9, 30), pick("teaching", "library"))
+        # lunch, 12:00 rush
+        day.go(_hm(11, 50), _hm(12, 30), pick("canteen"))
+        if rng.random() < 0.5:
+            day.go(day.time + 25, day.time + 50, home)
+        # afternoon: class, self-study or sport
+        roll = rng.random()
+        afternoon = ("teaching",) if roll < 0.6 else ("library",) if roll < 0.85 else ("sport", "library")
+        day.go(_hm(13, 20), _hm(14, 30), pick(*afternoon))
+        # dinner, 17:00 rush
+        day.go(_hm(17, 0), _hm(18, 10), pick("canteen"))
+        # evening
+        roll = rng.random()
+        if roll < 0.6:
+            day.go(day.time + 30, day.time + 50, pick("library"))
+        elif roll < 0.8:
+            day.go(day.time + 30, day.time + 50, pick("sport", "library"))
+        # back home for the night
+        day.go(_hm(21, 0), _hm(22, 30), home)
+
+        schedules[student] = day.legs
+    return schedules
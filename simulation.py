@@ -0,0 +1,361 @@
+"""
+Headless day simulation of the campus agents.
+
+The engine is a discrete-event loop over a heap of timestamped events. It
+uses the same schedules, routing backend and per-edge walking time as the
+GUI, but needs no display and runs as fast as the CPU allows:
+
+    python simulation.py --agents 7 --out trajectory.csv
+
+Node numbers in schedules are 1-based like the GUI entries; event nodes and
+paths are 0-based indices into the distance matrix, like routing.get_path.
+"""
+import argparse
+import heapq
+import itertools
+import math
+import time
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from agents import AgentStore, format_time, parse_time
+
+# at speed 1 the GUI clock runs one simulated minute per second and walks
+# one edge every 800 ms, so an edge takes 0.8 simulated minutes
+SECONDS_PER_MINUTE = 1.0
+EDGE_MINUTES = 0.8
+DAY_START = 8 * 60 + 20  # 8:20, same as CampusGUI
+DAY_END = 24 * 60
+
+# (departure time, start node, end node) per agent, 6 and 7 are professors
+DEFAULT_SCHEDULES: Dict[int, List[Tuple[str, int, int]]] = {
+    1: [("08:10", 31, 73), ("12:00", 73, 50), ("12:40", 50, 31), ("13:25", 31, 72), ("17:05", 72, 33),
+        ("17:35", 33, 64), ("21:30", 64, 31)],
+    2: [("08:20", 26, 72), ("12:10", 72, 32), ("12:50", 32, 26), ("13:35", 26, 64), ("17:15", 64, 50),
+        ("17:45", 50, 64), ("21:40", 64, 26)],
+    3: [("08:30", 27, 68), ("12:20", 68, 50), ("13:00", 50, 27), ("13:45", 27, 55), ("17:25", 55, 33),
+        ("18:00", 33, 64), ("21:55", 64, 27)],
+    4: [("09:00", 26, 67), ("13:00", 67, 50), ("13:30", 50, 26), ("14:15", 26, 64), ("17:45", 64, 103),
+        ("18:20", 103, 64), ("22:20", 64, 26)],
+    5: [("09:10", 31, 59), ("13:10", 59, 76), ("13:40", 76, 31), ("14:25", 31, 73), ("18:05", 73, 39),
+        ("18:35", 39, 120), ("22:35", 120, 31)],
+    6: [("08:30", 26, 67), ("12:10", 67, 103), ("12:55", 103, 26), ("13:40", 26, 135), ("15:00", 135, 26),
+        ("15:00", 26, 103), ("15:15", 103, 26)],
+    7: [("08:30", 26, 73), ("10:20", 73, 26), ("12:00", 26, 103), ("12:40", 103, 26), ("17:20", 26, 103),
+        ("17:50", 103, 133), ("19:25", 133, 26)]
+}
+
+
+class SimClock:
+    """
+    Simulated minutes derived from a monotonic wall clock.
+
+    minute = start + elapsed wall seconds * speed / SECONDS_PER_MINUTE, so a
+    busy or late Tk loop never makes the day drift; reading the clock late
+    just returns a bigger step, which the caller catches up on at once.
+    """
+
+    def __init__(self, start_minute: float = DAY_START, speed: float = 1.0,
+                 end_minute: float = DAY_END, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            speed: multiplier of the base pace, 10 runs a day ten times faster
+            clock: wall clock in seconds, monotonic
+        """
+        self.minute = float(start_minute)
+        self.speed = speed
+        self.end_minute = end_minute
+        self.clock = clock
+        self.running = False
+        self._last = clock()
+
+    def now(self) -> float:
+        """Current simulated minute, never past end_minute"""
+        if self.running:
+            t = self.clock()
+            self.minute = min(self.end_minute, self.minute + (t - self._last) * self.speed / SECONDS_PER_MINUTE)
+            self._last = t
+        return self.minute
+
+    @property
+    def finished(self) -> bool:
+        return self.minute >= self.end_minute
+
+    def start(self):
+        if not self.running:
+            self._last = self.clock()
+            self.running = True
+
+    def pause(self):
+        self.now()
+        self.running = False
+
+    def set_speed(self, speed: float):
+        # time so far counts at the old speed
+        self.now()
+        self.speed = speed
+
+    def step(self, minutes: float = 1.0) -> float:
+        """Jump ahead by minutes, typically while paused"""
+        self.now()
+        self.minute = min(self.end_minute, self.minute + minutes)
+        return self.minute
+
+    def reset(self, minute: float = DAY_START):
+        self.minute = float(minute)
+        self._last = self.clock()
+
+
+class SimEvent(NamedTuple):
+    """
+    kind:
+        depart: agent leaves `node` along `path`
+        node: agent reached `node` (one per hop, the trajectory)
+        arrive: agent reached the end of the leg at `node`
+        no_path: the router found no path, the leg is skipped (or ends at `node`
+            when every way on is closed mid-walk)
+        reroute: agent at `node` takes `path` for the rest of the leg
+            (congestion-aware routers only)
+    """
+    time: float
+    agent: int
+    kind: str
+    node: int
+    path: Tuple[int, ...] = ()
+
+
+class SimulationEngine:
+
+    def __init__(self, router, schedules: Dict[int, List[Tuple[str, int, int]]] = None,
+                 start_minute: float = DAY_START, edge_minutes: float = EDGE_MINUTES,
+                 store: AgentStore = None):
+        """
+        Args:
+            router: routing backend with path(start, end), see routing.py
+            schedules: agent id -> [(time, start_node, end_node)], 1-based nodes, ids 1..N
+            start_minute: simulated clock at the start, legs due earlier leave at once
+            edge_minutes: simulated walking time per edge
+            store: agent rows (row = id - 1) kept up to date with node,
+                next_departure and schedule_index
+        """
+        self.router = router
+        self.schedules = schedules if schedules is not None else DEFAULT_SCHEDULES
+        self.store = store if store is not None else AgentStore.from_schedules(self.schedules)
+        self.edge_minutes = edge_minutes
+        self.now = start_minute
+        self.trajectory: List[SimEvent] = []
+        self._subscribers: List[Callable[[SimEvent], None]] = []
+        self._queue = []
+        self._seq = itertools.count()  # stable order for events at the same time
+        self._planned = {}  # agent -> edge costs of its route when it was planned
+        self._route_start = {}  # agent -> hop where its last depart / reroute path begins
+        # routes of the departures due at one time (_wave_key), looked up in one batch
+        self._wave: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+        self._wave_key = None
+        self._departures: Dict[float, List[Tuple[int, int]]] = {}  # time -> (agent, leg) due then
+
+        for agent, schedule in self.schedules.items():
+            if schedule:
+                self._schedule_leg(agent, 0, start_minute)
+
+    @property
+    def congestion(self) -> bool:
+        """
+        Routers with enter_edge / leave_edge (routing.CongestionRouter) are
+        walked hop by hop, so every edge is timed and loaded when entered.
+        """
+        return hasattr(self.router, "enter_edge")
+
+    def subscribe(self, callback: Callable[[SimEvent], None]):
+        """callback(event) is called for every event as it is processed"""
+        self._subscribers.append(callback)
+
+    def next_event_time(self) -> float:
+        return self._queue[0][0] if self._queue else float('inf')
+
+    def advance_to(self, minute: float):
+        """Process every event due at or before minute"""
+        while self._queue and self._queue[0][0] <= minute:
+            event_time, _, action, args = heapq.heappop(self._queue)
+            self.now = event_time
+            if action == self._depart and args not in self._wave:
+                self._route_wave(event_time, args)
+            action(*args)
+        self.now = max(self.now, minute)
+
+    def run(self, end_minute: float = DAY_END) -> List[SimEvent]:
+        """Run the rest of the day and return the trajectory log"""
+        self.advance_to(end_minute)
+        return self.trajectory
+
+    def _push(self, event_time: float, action, *args):
+        heapq.heappush(self._queue, (event_time, next(self._seq), action, args))
+
+    def _emit(self, event: SimEvent):
+        self.trajectory.append(event)
+        for callback in self._subscribers:
+            callback(event)
+
+    def _schedule_leg(self, agent: int, leg: int, earliest: float):
+        # an agent still walking leaves as soon as the previous leg is done
+        due = parse_time(self.schedules[agent][leg][0])
+        departure = max(due, earliest)
+        self.store.schedule_index[agent - 1] = leg
+        self.store.next_departure[agent - 1] = departure
+        self._push(departure, self._depart, agent, leg)
+        self._departures.setdefault(departure, []).append((agent, leg))
+
+    def _route_wave(self, event_time: float, first: Tuple[int, int]):
+        """
+        Route every departure due at event_time with one router.paths call.
+        Congested agents are still routed one by one when they leave, each
+        sees the load of those who left before it.
+        """
+        self._wave = {}
+        # first and every departure pushed for event_time so far, still queued
+        due = self._departures.pop(event_time, [first])
+        if self.congestion or not hasattr(self.router, "paths"):
+            return
+        self._wave_key = (event_time, self.router)
+        legs = [self.schedules[agent][leg] for agent, leg in due]
+        batch = self.router.paths([start - 1 for _, start, _ in legs], [end - 1 for _, _, end in legs])
+        self._wave = {key: tuple(batch.path(i)) for i, key in enumerate(due)}
+
+    def _depart(self, agent: int, leg: int):
+        _, start_node, end_node = self.schedules[agent][leg]
+        start_idx, end_idx = start_node - 1, end_node - 1
+        path = self._wave.pop((agent, leg), None)
+        if path is None or self._wave_key != (self.now, self.router):
+            path = tuple(self.router.path(start_idx, end_idx))
+        self.store.next_departure[agent - 1] = float('inf')
+
+        if not path:
+            self._emit(SimEvent(self.now, agent, "no_path", start_idx))
+            self._finish_leg(agent, leg)
+            return
+
+        self._emit(SimEvent(self.now, agent, "depart", start_idx, path))
+        if self.congestion:
+            self._planned[agent] = self.router.edge_costs(path)
+            self._route_start[agent] = 0
+            self._walk(agent, leg, path, 0)
+            return
+        for hop, node in enumerate(path[1:], 1):
+            self._push(self.now + hop * self.edge_minutes, self._reach, agent, leg, node, hop == len(path) - 1)
+        if len(path) == 1:
+            self._reach(agent, leg, path[0], True)
+
+    def _walk(self, agent: int, leg: int, path: Tuple[int, ...], hop: int):
+        """Enter edge path[hop] -> path[hop + 1] at the speed its current load allows"""
+        if hop == len(path) - 1:
+            self._reach(agent, leg, path[hop], True)
+            return
+        if not math.isfinite(self.router.slowdown(path[hop], path[hop + 1])):
+            # the edge was closed on the way, go around it or give up here
+            rest = self.router.path(path[hop], path[-1])
+            if not rest:
+                self._emit(SimEvent(self.now, agent, "no_path", path[hop]))
+                self._finish_leg(agent, leg)
+                return
+            path = path[:hop] + tuple(rest)
+            self._planned[agent] = self.router.edge_costs(path)
+            self._route_start[agent] = hop
+            self._emit(SimEvent(self.now, agent, "reroute", path[hop], tuple(rest)))
+        minutes = self.edge_minutes * self.router.enter_edge(path[hop], path[hop + 1])
+        # the GUI walks the route of the last depart / reroute event in the
+        # same store rows, each edge as long as it takes here
+        self.store.time_edge(agent - 1, hop - self._route_start[agent], minutes * SECONDS_PER_MINUTE)
+        self._push(self.now + minutes, self._walked, agent, leg, path, hop + 1)
+
+    def _walked(self, agent: int, leg: int, path: Tuple[int, ...], hop: int):
+        if self.congestion:
+            self.router.leave_edge(path[hop - 1], path[hop])
+        last = hop == len(path) - 1
+        self._reach(agent, leg, path[hop], last)
+        if last:
+            return
+        if not self.congestion:
+            # the router was switched mid-walk, finish the leg at the fixed pace
+            for step, node in enumerate(path[hop + 1:], 1):
+                self.store.time_edge(agent - 1, hop + step - 1 - self._route_start[agent],
+                                     self.edge_minutes * SECONDS_PER_MINUTE)
+                self._push(self.now + step * self.edge_minutes, self._reach, agent, leg, node,
+                           hop + step == len(path) - 1)
+            return
+
+        rest = self.router.replan(path, hop, self._planned[agent])
+        if rest:
+            path = path[:hop] + tuple(rest)
+            self._planned[agent] = self.router.edge_costs(path)
+            self._route_start[agent] = hop
+            self._emit(SimEvent(self.now, agent, "reroute", path[hop], tuple(rest)))
+        self._walk(agent, leg, path, hop)
+
+    def _reach(self, agent: int, leg: int, node: int, last: bool):
+        self.store.node[agent - 1] = node
+        self._emit(SimEvent(self.now, agent, "node", node))
+        if last:
+            self._emit(SimEvent(self.now, agent, "arrive", node))
+            self._finish_leg(agent, leg)
+
+    def _finish_leg(self, agent: int, leg: int):
+        if leg + 1 < len(self.schedules[agent]):
+            self._schedule_leg(agent, leg + 1, self.now)
+        else:
+            self.store.schedule_index[agent - 1] = leg + 1
+
+
+def replicate_schedules(count: int, base: Dict[int, List[Tuple[str, int, int]]] = None):
+    """count agents cycling through the base schedules"""
+    base = base or DEFAULT_SCHEDULES
+    seeds = list(base.values())
+    return {agent: seeds[(agent - 1) % len(seeds)] for agent in range(1, count + 1)}
+
+
+def write_trajectory(path: str, events: List[SimEvent]):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("time,clock,agent,event,node\n")
+        for e in events:
+            f.write(f"{e.time:.2f},{format_time(e.time)},{e.agent},{e.kind},{e.node + 1}\n")
+
+
+def main():
+    from campus_data import NODE_POSITIONS
+    from matrix_cache import load_matrix
+    from routing import ROUTERS, create_router
+    from schedule_generator import generate_schedules
+
+    parser = argparse.ArgumentParser(description="Run one simulated day without the GUI")
+    parser.add_argument("--agents", type=int, default=len(DEFAULT_SCHEDULES))
+    parser.add_argument("--generate", action="store_true",
+                        help="synthetic schedules instead of repeating the default 7")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--router", default="floyd", choices=list(ROUTERS))
+    parser.add_argument("--matrix", default="matrix_update.xlsx")
+    parser.add_argument("--out", help="write the trajectory log as csv")
+    args = parser.parse_args()
+
+    matrix, dist, next_hop = load_matrix(args.matrix)
+    router = create_router(args.router, NODE_POSITIONS)
+    router.set_matrix(matrix, solved=(dist, next_hop))
+
+    if args.generate:
+        schedules = generate_schedules(args.agents, seed=args.seed, node_count=len(matrix))
+    else:
+        schedules = replicate_schedules(args.agents)
+
+    engine = SimulationEngine(router, schedules)
+    t0 = time.perf_counter()
+    events = engine.run()
+    elapsed = time.perf_counter() - t0
+
+    kinds = {}
+    for e in events:
+        kinds[e.kind] = kinds.get(e.kind, 0) + 1
+    print(f"{args.agents} agents, {len(events)} events in {elapsed:.3f} s "
+          f"({', '.join(f'{k}: {v}' for k, v in sorted(kinds.items()))})")
+    if args.out:
+        write_trajectory(args.out, events)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Virtualized table widget.
+
+A ttk.Treeview that only ever holds one screen of rows. The data stays in
+the caller's arrays; scrolling re-fills the same few Treeview items from
+`get_row`, so opening, scrolling and re-sorting cost the same for 100 or
+100,000 records.
+"""
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, List, Sequence, Tuple
+
+import numpy as np
+
+
+class VirtualTable(ttk.Frame):
+
+    def __init__(self, master, columns: List[Tuple[str, str, int]], get_row: Callable[[int], tuple],
+                 visible_rows: int = 25, on_sort: Callable[[str], None] = None):
+        """
+        Args:
+            columns: (key, heading, width) per column
+            get_row: record index -> tuple of cell values
+            visible_rows: rows on screen, also the number of Treeview items
+            on_sort: called with the column key when a heading is clicked
+        """
+        super().__init__(master)
+        self.get_row = get_row
+        self.order: Sequence[int] = ()
+        self.top = 0
+
+        keys = [key for key, _, _ in columns]
+        self.tree = ttk.Treeview(self, columns=keys, show="headings", height=visible_rows, selectmode="browse")
+        for key, heading, width in columns:
+            command = (lambda k=key: on_sort(k)) if on_sort else ""
+            self.tree.heading(key, text=heading, command=command)
+            self.tree.column(key, width=width, stretch=True)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.items = [self.tree.insert("", tk.END, values=()) for _ in range(visible_rows)]
+
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_to(self.top - (1 if e.delta > 0 else -1) * 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.top - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.top + 3))
+
+    def set_rows(self, order: Sequence[int]):
+        """Show these record indexes, in this order"""
+        self.order = order
+        self.scroll_to(0)
+
+    def sort_by(self, values: np.ndarray, descending: bool = False):
+        """Reorder the shown records by values[record], stable"""
+        order = np.asarray(self.order, dtype=np.int64)
+        ranks = np.argsort(values[order], kind="stable")
+        if descending:
+            ranks = ranks[::-1]
+        self.set_rows(order[ranks])
+
+    def scroll_to(self, top: int):
+        visible = len(self.items)
+        self.top = max(0, min(int(top), len(self.order) - visible))
+        for i, item in enumerate(self.items):
+            index = self.top + i
+            values = self.get_row(int(self.order[index])) if index < len(self.order) else ()
+            self.tree.item(item, values=values)
+
+        total = len(self.order)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_scroll(self, *args):
+        visible = len(self.items)
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.order))
+        elif args[0] == "scroll":
+            step = visible if args[2] == "pages" else 1
+            self.scroll_to(self.top + int(args[1]) * step)